@@ -0,0 +1,128 @@
+#add parent directory to import path
+import os.path, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+#External Dependencies
+import argparse
+import itertools
+import json
+import platform
+import numpy as np
+
+#Internal Dependencies
+from dataTypes import *
+import chargeSolving
+import pipeline
+import instrumentation
+import driver
+
+#stages of pipeline.run in the order they run, as named in the records of instrumentation.Recorder
+stages = ("generate", "merge", "reconstruct", "geometryMatrix", "measure", "whiten", "truth", "solve", "score")
+
+volume = DetectorVolume(1000.0, 1000.0)
+
+def scenarios(pitches, planeCounts, blobCounts):
+    """Name, wire pitches and number of blobs of every combination of detector and multiplicity"""
+    for pitch, noOfPlanes, noOfBlobs in itertools.product(pitches, planeCounts, blobCounts):
+        name = "pitch" + str(pitch) + "_planes" + str(noOfPlanes) + "_blobs" + str(noOfBlobs)
+        yield name, [float(pitch)] * noOfPlanes, noOfBlobs
+
+def runScenario(wirePitches, noOfBlobs, noOfEvents, repeats, seed, alpha, solver):
+    """Time every stage on the same fixed-seed events, keeping the fastest of the repeats
+
+    Returns
+    -------
+    dict
+        Mean seconds per event of every stage, their total and the mean number of cells
+
+    """
+    angles = driver.generateAngles(len(wirePitches))
+
+    #one untimed event so imports and caches are not charged to the first stage that needs them
+    for event in pipeline.run(volume, wirePitches, angles, noOfBlobs, [alpha], [noOfEvents], seed, solver):
+        pass
+
+    best = None
+    for repeat in range(repeats):
+        recorder = instrumentation.Recorder()
+        for event in pipeline.run(volume, wirePitches, angles, noOfBlobs, [alpha], range(noOfEvents), seed, solver, recorder=recorder):
+            pass
+
+        summary = recorder.summary()
+        timings = {stage: summary[stage + ".time"]["mean"] for stage in stages}
+        if best is None or sum(timings.values()) < sum(best.values()):
+            best = timings
+            noOfCells = summary["reconstruct.cells"]["mean"]
+
+    result = dict(best)
+    result["total"] = sum(best.values())
+    result["cells"] = noOfCells
+
+    return result
+
+def compare(results, baseline, threshold, minimumTime):
+    """Stages slower than the baseline by more than threshold, ignoring stages faster than minimumTime
+
+    Returns
+    -------
+    list of tuple
+        (scenario, stage, baseline seconds, seconds) of every regression
+
+    """
+    regressions = []
+    for name, timings in results["scenarios"].items():
+        for stage in stages + ("total",):
+            if name not in baseline["scenarios"] or stage not in baseline["scenarios"][name]:
+                continue
+            before, after = baseline["scenarios"][name][stage], timings[stage]
+            if after > minimumTime and after > threshold * before:
+                regressions.append((name, stage, before, after))
+
+    return regressions
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Time every stage of the reconstruction chain on fixed-seed events")
+    parser.add_argument("--pitches", type=float, nargs="+", default=[3.0, 5.0, 10.0])
+    parser.add_argument("--planes", type=int, nargs="+", default=[2, 3, 4, 5])
+    parser.add_argument("--blobs", type=int, nargs="+", default=[3, 10, 30])
+    parser.add_argument("--events", type=int, default=10, help="events per scenario")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per scenario, the fastest is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--alpha", type=float, default=0.1)
+    parser.add_argument("--solver", default="lasso", choices=sorted(chargeSolving.solvers))
+    parser.add_argument("--output", help="JSON file to store the results in")
+    parser.add_argument("--compare", help="JSON file of earlier results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown factor flagged as a regression")
+    parser.add_argument("--minimum-time", type=float, default=1e-4, help="seconds per event below which stages are not flagged")
+    args = parser.parse_args(argv[1:])
+
+    results = {
+        "settings": {"events": args.events, "repeats": args.repeats, "seed": args.seed, "alpha": args.alpha, "solver": args.solver},
+        "machine": {"python": platform.python_version(), "numpy": np.__version__, "processor": platform.machine()},
+        "scenarios": {},
+    }
+
+    print("{:<28}".format("scenario") + "".join("{:>15}".format(stage) for stage in stages + ("total",)) + "{:>8}".format("cells"))
+    for name, wirePitches, noOfBlobs in scenarios(args.pitches, args.planes, args.blobs):
+        result = runScenario(wirePitches, noOfBlobs, args.events, args.repeats, args.seed, args.alpha, args.solver)
+        results["scenarios"][name] = result
+
+        print("{:<28}".format(name) + "".join("{:>13.3f}ms".format(1000 * result[stage]) for stage in stages + ("total",)) + "{:>8.0f}".format(result["cells"]))
+
+    if args.output:
+        with open(args.output, "w") as outputFile:
+            json.dump(results, outputFile, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baselineFile:
+            regressions = compare(results, json.load(baselineFile), args.threshold, args.minimum_time)
+
+        for name, stage, before, after in regressions:
+            print("\033[91m", "Regression:", name, stage, "{:.3f}ms -> {:.3f}ms".format(1000 * before, 1000 * after), "\033[0m")
+        if regressions:
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
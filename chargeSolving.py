@@ -1,14 +1,343 @@
 # External Dependencies
+import time
 import numpy as np
-from sklearn import linear_model
+from scipy import sparse
+from scipy import optimize
 
 # Internal Dependencies
 from dataTypes import *
 
-def solve(wireMatrix, geometryMatrix, alpha = 1):
-    chargeSolving = linear_model.Lasso(positive = True, alpha=alpha)
-    chargeSolving.fit(geometryMatrix,wireMatrix)
+def lassoSolver(geometryMatrix, wireCharges, alpha, initialCharges=None):
+    """Non-negative Lasso from scikit-learn
 
-    solved = np.reshape(np.matrix(chargeSolving.coef_),(geometryMatrix.shape[1],1))
+    Parameters
+    ----------
+    geometryMatrix : np.ndarray or scipy.sparse matrix
+        Matrix that associates merged wires with merged cells
+    wireCharges : np.ndarray
+        Charge measured on every merged wire
+    alpha : float
+        Regularization strength
+    initialCharges : np.ndarray
+        Charges to start from, zero if None
 
+    Returns
+    -------
+    np.ndarray, int, Boolean
+        Charge of every cell, number of iterations, whether the solver converged
+
+    """
+    #imported here as scikit-learn is slow to import and only needed by this backend
+    from sklearn import linear_model
+
+    chargeSolving = linear_model.Lasso(positive = True, alpha=alpha, warm_start = initialCharges is not None)
+    if initialCharges is not None:
+        chargeSolving.coef_ = np.array(initialCharges, dtype=float)
+    chargeSolving.fit(geometryMatrix,wireCharges)
+
+    return chargeSolving.coef_, chargeSolving.n_iter_, chargeSolving.n_iter_ < chargeSolving.max_iter
+
+def nnlsSolver(geometryMatrix, wireCharges, alpha, initialCharges=None):
+    """Non-negative least squares from scipy, without regularization or intercept
+
+    Parameters
+    ----------
+    geometryMatrix : np.ndarray or scipy.sparse matrix
+        Matrix that associates merged wires with merged cells
+    wireCharges : np.ndarray
+        Charge measured on every merged wire
+    alpha : float
+        Ignored, kept so every solver can be called the same way
+    initialCharges : np.ndarray
+        Ignored, kept so every solver can be called the same way
+
+    Returns
+    -------
+    np.ndarray, None, Boolean
+        Charge of every cell, number of iterations (not reported by scipy), whether the solver converged
+
+    """
+    if sparse.issparse(geometryMatrix):
+        geometryMatrix = geometryMatrix.toarray()
+
+    charges, residual = optimize.nnls(geometryMatrix, wireCharges)
+
+    return charges, None, True
+
+def coordinateDescentSolver(geometryMatrix, wireCharges, alpha, initialCharges=None, maxIterations=1000, tolerance=1e-4):
+    """Non-negative Lasso solved by cyclic coordinate descent on the Gram matrix
+
+    Solves the same problem as lassoSolver, including the intercept. Geometry
+    matrices have few, mostly fractional, entries per cell so their Gram matrix
+    is sparse and cheap to form, the centring being applied as a rank one
+    correction, and only a handful of cells end up with charge, so sweeps
+    only visit cells that can be non-zero.
+
+    Parameters
+    ----------
+    geometryMatrix : np.ndarray or scipy.sparse matrix
+        Matrix that associates merged wires with merged cells
+    wireCharges : np.ndarray
+        Charge measured on every merged wire
+    alpha : float
+        Regularization strength
+    initialCharges : np.ndarray
+        Charges to start from, zero if None
+    maxIterations : int
+        Maximum number of passes over all cells
+    tolerance : float
+        Stop when the largest update is smaller than tolerance times the largest charge
+
+    Returns
+    -------
+    np.ndarray, int, Boolean
+        Charge of every cell, number of iterations, whether the solver converged
+
+    """
+    gram, correlation, centring = centredGram(geometryMatrix, wireCharges)
+
+    return coordinateDescent(gram, correlation, geometryMatrix.shape[0] * alpha, initialCharges, maxIterations, tolerance, centring)
+
+def coordinateDescentPath(geometryMatrix, wireCharges, alphas, maxIterations=1000, tolerance=1e-4):
+    """Solve coordinateDescentSolver for many regularization strengths, forming the Gram matrix once
+
+    Parameters
+    ----------
+    geometryMatrix : np.ndarray or scipy.sparse matrix
+        Matrix that associates merged wires with merged cells
+    wireCharges : np.ndarray
+        Charge measured on every merged wire
+    alphas : list of float
+        Regularization strengths, each solve is warm started from the previous one
+    maxIterations : int
+        Maximum number of passes over all cells for each alpha
+    tolerance : float
+        Stop when the largest update is smaller than tolerance times the largest charge
+
+    Yields
+    ------
+    np.ndarray, int, Boolean
+        Charge of every cell, number of iterations, whether the solver converged, for every alpha in order
+
+    """
+    gram, correlation, centring = centredGram(geometryMatrix, wireCharges)
+
+    charges = None
+    for alpha in alphas:
+        charges, iterations, converged = coordinateDescent(gram, correlation, geometryMatrix.shape[0] * alpha, charges, maxIterations, tolerance, centring)
+        yield charges.copy(), iterations, converged
+
+def centredGram(geometryMatrix, wireCharges):
+    """Gram matrix and correlations of the least squares problem centred on the column means
+
+    Centring makes the Gram matrix dense, so it is returned uncentred, sparse
+    for large sparse geometry matrices, with the rank one correction that
+    centres it: the centred Gram matrix is gram - outer(centring, centring).
+
+    Parameters
+    ----------
+    geometryMatrix : np.ndarray or scipy.sparse matrix
+        Matrix that associates merged wires with merged cells
+    wireCharges : np.ndarray
+        Charge measured on every merged wire
+
+    Returns
+    -------
+    np.ndarray or scipy.sparse.csr_matrix, np.ndarray, np.ndarray
+        Gram matrix of the geometry matrix, correlation of the centred charges with every cell,
+        column means scaled by the square root of the number of merged wires
+
+    """
+    noOfWires, noOfCells = geometryMatrix.shape
+
+    #sparse overhead dominates for the small systems of typical events
+    if sparse.issparse(geometryMatrix) and noOfWires * noOfCells <= 1000000:
+        geometryMatrix = geometryMatrix.toarray()
+
+    cellMeans = np.asarray(geometryMatrix.mean(axis=0)).ravel()
+    gram = geometryMatrix.T @ geometryMatrix
+    gram = sparse.csr_matrix(gram) if sparse.issparse(gram) else np.asarray(gram)
+    correlation = np.asarray(geometryMatrix.T @ wireCharges).ravel() - noOfWires * cellMeans * wireCharges.mean()
+
+    return gram, correlation, np.sqrt(noOfWires) * cellMeans
+
+def coordinateDescent(gram, correlation, threshold, initialCharges=None, maxIterations=1000, tolerance=1e-4, centring=None):
+    """Cyclic coordinate descent for a non-negative Lasso given its Gram matrix
+
+    Parameters
+    ----------
+    gram : np.ndarray or scipy.sparse.csr_matrix
+        Gram matrix of the geometry matrix, centred by centring
+    correlation : np.ndarray
+        Correlation of the centred charges with every cell
+    threshold : float
+        Regularization strength scaled by the number of merged wires
+    initialCharges : np.ndarray
+        Charges to start from, zero if None
+    maxIterations : int
+        Maximum number of passes over the cells
+    tolerance : float
+        Stop when the largest update is smaller than tolerance times the largest charge
+    centring : np.ndarray
+        Rank one correction of the Gram matrix, the problem is solved for gram - outer(centring, centring).
+        No correction if None
+
+    Returns
+    -------
+    np.ndarray, int, Boolean
+        Charge of every cell, number of iterations, whether the solver converged
+
+    """
+    noOfCells = len(correlation)
+    if centring is None:
+        centring = np.zeros(noOfCells)
+
+    isSparse = sparse.issparse(gram)
+    if isSparse:
+        gram = sparse.csr_matrix(gram)
+        indptr, indices, data = gram.indptr, gram.indices, gram.data
+    diagonal = np.asarray(gram.diagonal()).ravel() - centring ** 2
+
+    if initialCharges is None:
+        charges = np.zeros(noOfCells)
+        #gradient of the unregularized objective, correlation - (gram - outer(centring, centring)) @ charges
+        gradient = correlation.copy()
+    else:
+        charges = np.array(initialCharges, dtype=float)
+        gradient = correlation - np.asarray(gram @ charges).ravel() + centring * (centring @ charges)
+
+    #only cells that can become non-zero are swept, the rest are checked at once when the sweep converges
+    activeCells = np.flatnonzero((diagonal > 0) & ((gradient > threshold) | (charges > 0)))
+
+    converged = False
+    iteration = 0
+    while iteration < maxIterations:
+        iteration += 1
+
+        maxChange = 0
+        for cellNo in activeCells.tolist():
+            oldCharge = charges[cellNo]
+            newCharge = max(0.0, oldCharge + (gradient[cellNo] - threshold) / diagonal[cellNo])
+
+            if newCharge != oldCharge:
+                change = newCharge - oldCharge
+                if isSparse:
+                    start, stop = indptr[cellNo], indptr[cellNo + 1]
+                    gradient[indices[start:stop]] -= data[start:stop] * change
+                else:
+                    gradient -= gram[cellNo] * change
+                gradient += centring * (centring[cellNo] * change)
+                charges[cellNo] = newCharge
+                maxChange = max(maxChange, abs(change))
+
+        if maxChange <= tolerance * charges.max(initial=0):
+            #cells at zero that would move by more than the tolerance are added to the sweep
+            step = np.divide(gradient - threshold, diagonal, out=np.zeros(noOfCells), where=diagonal > 0)
+            violatingCells = np.flatnonzero((charges == 0) & (step > tolerance * charges.max(initial=0)))
+
+            if len(violatingCells) == 0:
+                converged = True
+                break
+            activeCells = np.union1d(activeCells, violatingCells)
+
+    return charges, iteration, converged
+
+#solvers selectable by name in solve
+solvers = {
+    "lasso": lassoSolver,
+    "nnls": nnlsSolver,
+    "cd": coordinateDescentSolver,
+}
+
+#solvers that handle a whole regularization path themselves, others are warm started one alpha at a time
+pathSolvers = {
+    "cd": coordinateDescentPath,
+}
+
+def solve(wireMatrix, geometryMatrix, alpha = 1, solver = "lasso", returnInfo = False):
+    """Solve for the charge of every cell from the charge measured on merged wires
+
+    Parameters
+    ----------
+    wireMatrix : np.matrix
+        Charge measured on every merged wire
+    geometryMatrix : np.matrix or scipy.sparse matrix
+        Matrix that associates merged wires with merged cells
+    alpha : float
+        Regularization strength
+    solver : str
+        Name of the solver in solvers to use
+    returnInfo : Boolean
+        Also return information about how the solver ran
+
+    Returns
+    -------
+    np.matrix or np.matrix, SolverInfo
+        Charge of every cell, and information about the solve if returnInfo is True
+
+    """
+    solved, info = solvePath(wireMatrix, geometryMatrix, [alpha], solver, returnInfo = True)
+
+    if returnInfo:
+        return solved[0], info[0]
+    return solved[0]
+
+def solvePath(wireMatrix, geometryMatrix, alphas, solver = "lasso", returnInfo = False):
+    """Solve for the charge of every cell for many regularization strengths
+
+    The alphas are solved from the largest to the smallest, each solve starting
+    from the solution of the previous one.
+
+    Parameters
+    ----------
+    wireMatrix : np.matrix
+        Charge measured on every merged wire
+    geometryMatrix : np.matrix or scipy.sparse matrix
+        Matrix that associates merged wires with merged cells
+    alphas : list of float
+        Regularization strengths
+    solver : str
+        Name of the solver in solvers to use
+    returnInfo : Boolean
+        Also return information about how the solver ran
+
+    Returns
+    -------
+    list of np.matrix or list of np.matrix, list of SolverInfo
+        Charge of every cell for every alpha in the order given, and information about each solve if returnInfo is True
+
+    """
+    if solver not in solvers:
+        raise ValueError("Unknown solver " + repr(solver) + ", expected one of " + ", ".join(solvers))
+
+    #sparse geometry matrices are solved in column major form
+    if sparse.issparse(geometryMatrix):
+        geometryMatrix = sparse.csc_matrix(geometryMatrix)
+    else:
+        geometryMatrix = np.asarray(geometryMatrix)
+    wireCharges = np.asarray(wireMatrix, dtype=float).ravel()
+
+    order = sorted(range(len(alphas)), key=lambda alphaNo: alphas[alphaNo], reverse=True)
+    solved = [None] * len(alphas)
+    info = [None] * len(alphas)
+
+    if solver in pathSolvers:
+        results = pathSolvers[solver](geometryMatrix, wireCharges, [alphas[alphaNo] for alphaNo in order])
+    else:
+        results = None
+
+    charges = None
+    for alphaNo in order:
+        start = time.perf_counter()
+        if results is None:
+            charges, iterations, converged = solvers[solver](geometryMatrix, wireCharges, alphas[alphaNo], charges)
+        else:
+            charges, iterations, converged = next(results)
+        elapsed = time.perf_counter() - start
+
+        solved[alphaNo] = np.reshape(np.matrix(charges),(geometryMatrix.shape[1],1))
+        info[alphaNo] = SolverInfo(solver, iterations, elapsed, converged)
+
+    if returnInfo:
+        return solved, info
     return solved
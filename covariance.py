@@ -0,0 +1,231 @@
+# External Dependencies
+import abc
+import numpy as np
+from scipy import sparse
+from scipy import linalg
+
+def _whitenDense(factor, matrix):
+    """Solve factor * x = matrix for a lower triangular factor, keeping the type of matrix"""
+    if sparse.issparse(matrix):
+        return sparse.csr_matrix(linalg.solve_triangular(factor, matrix.toarray(), lower=True))
+
+    return np.asmatrix(linalg.solve_triangular(factor, np.asarray(matrix, dtype=float), lower=True))
+
+def _cholesky(matrix):
+    """Lower triangular Cholesky factor of a covariance matrix, which must be positive definite"""
+    try:
+        return np.linalg.cholesky(np.asarray(matrix, dtype=float))
+    except np.linalg.LinAlgError:
+        raise ValueError("Covariance matrix is not positive definite")
+
+class Covariance(abc.ABC):
+    """Covariance of the noise on the merged channels
+
+    Subclasses whiten the measurement in the cheapest way for their form, so
+    the least squares problem on the whitened matrices has unit noise.
+
+    Attributes
+    ----------
+    size : int
+        Number of merged channels
+    """
+
+    @abc.abstractmethod
+    def whiten(self, matrix):
+        """Rows of matrix scaled by the inverse Cholesky factor of the covariance
+
+        Parameters
+        ----------
+        matrix : np.matrix or scipy.sparse matrix
+            Matrix with one row per merged channel
+
+        Returns
+        -------
+        np.matrix or scipy.sparse matrix
+            The whitened matrix, sparse if matrix is sparse
+        """
+
+class IdentityCovariance(Covariance):
+    """Covariance of channels with independent unit noise, whitening does nothing
+
+    Parameters
+    ----------
+    size : int
+        Number of merged channels
+    """
+
+    def __init__(self, size):
+        self.size = size
+
+    def whiten(self, matrix):
+        """Nothing to do, unit noise is already white"""
+        return matrix
+
+class DiagonalCovariance(Covariance):
+    """Covariance of channels with independent noise of a different variance on every channel
+
+    Parameters
+    ----------
+    variances : array_like of float
+        Noise variance of every merged channel
+    """
+
+    def __init__(self, variances):
+        self.variances = np.asarray(variances, dtype=float).ravel()
+        if not (self.variances > 0).all():
+            raise ValueError("Noise variances must be positive, got " + str(self.variances[~(self.variances > 0)].tolist()))
+        self.size = len(self.variances)
+
+    def whiten(self, matrix):
+        """Scale every row by the inverse noise of its channel"""
+        scale = 1 / np.sqrt(self.variances)
+
+        if sparse.issparse(matrix):
+            return sparse.csr_matrix(sparse.diags(scale) @ matrix)
+        return np.asmatrix(scale[:, np.newaxis] * np.asarray(matrix, dtype=float))
+
+class BlockDiagonalCovariance(Covariance):
+    """Covariance of channels that are only correlated within groups, e.g. the channels of one plane
+
+    Channels not in any group have independent unit noise.
+
+    Parameters
+    ----------
+    size : int
+        Number of merged channels
+    rows : list of array_like of int
+        Rows of the merged channels in every group
+    blocks : list of array_like of float
+        Covariance matrix of the channels of every group, in the order of rows
+    """
+
+    def __init__(self, size, rows, blocks):
+        self.size = size
+        self.rows = [np.asarray(groupRows, dtype=int) for groupRows in rows]
+        self.factors = [_cholesky(block) for block in blocks]
+
+    def whiten(self, matrix):
+        """Triangular solve with the Cholesky factor of every group"""
+        if not sparse.issparse(matrix):
+            whitened = np.array(matrix, dtype=float)
+            for groupRows, factor in zip(self.rows, self.factors):
+                whitened[groupRows] = linalg.solve_triangular(factor, whitened[groupRows], lower=True)
+            return np.asmatrix(whitened)
+
+        #whiten every group on its own then put the rows back in order
+        matrix = sparse.csr_matrix(matrix)
+        grouped = np.concatenate(self.rows + [np.zeros(0, dtype=int)])
+        ungrouped = np.setdiff1d(np.arange(self.size), grouped)
+
+        pieces = [_whitenDense(factor, matrix[groupRows]) for groupRows, factor in zip(self.rows, self.factors)]
+        stacked = sparse.vstack(pieces + [matrix[ungrouped]], format="csr")
+
+        return stacked[np.argsort(np.concatenate((grouped, ungrouped)))]
+
+class DenseCovariance(Covariance):
+    """Covariance of channels with arbitrary correlations
+
+    Parameters
+    ----------
+    matrix : array_like of float
+        Covariance matrix of the merged channels
+    """
+
+    def __init__(self, matrix):
+        self.factor = _cholesky(matrix)
+        self.size = len(self.factor)
+
+    def whiten(self, matrix):
+        """Triangular solve with the Cholesky factor of the covariance"""
+        return _whitenDense(self.factor, matrix)
+
+class ChannelNoise(object):
+    """Noise covariance of every event made from the noise variance of every channel of the detector
+
+    Merged channels differ from event to event, so their covariance is built
+    for each event from its channel list. A merged channel measures the charge
+    summed over its channels, so with independent channels its variance is the
+    sum of theirs.
+
+    Parameters
+    ----------
+    variances : array_like of float
+        Noise variance of every channel, indexed by channel number (see utilities.getChannelNos)
+    """
+
+    def __init__(self, variances):
+        variances = np.asarray(variances, dtype=float).ravel()
+        if not (variances > 0).all():
+            raise ValueError("Noise variances must be positive, got " + str(variances[~(variances > 0)].tolist()))
+        self.variances = variances
+        self.cumulative = np.concatenate(([0.0], np.cumsum(variances)))
+
+    def __call__(self, channelList):
+        """Covariance of the merged channels of an event
+
+        Parameters
+        ----------
+        channelList : list of tuple[2] int
+            First and last channel of every merged channel
+
+        Returns
+        -------
+        DiagonalCovariance
+            Noise covariance of the merged channels
+
+        """
+        channels = np.asarray(channelList, dtype=int).reshape(-1, 2)
+        if len(channels) and (channels.min() < 0 or channels.max() >= len(self.variances)):
+            raise ValueError("Merged channels reach channel " + str(int(channels.max())) + ", variances are only given for " + str(len(self.variances)))
+
+        return DiagonalCovariance(self.cumulative[channels[:, 1] + 1] - self.cumulative[channels[:, 0]])
+
+def noiseCovariance(noise, channelList):
+    """Noise covariance of the merged channels of an event
+
+    Parameters
+    ----------
+    noise : callable
+        Noise covariance, a Covariance or array_like of float, of the channel list of an event, e.g. a ChannelNoise.
+        Unit noise if None
+    channelList : list of tuple[2] int
+        First and last channel of every merged channel
+
+    Returns
+    -------
+    Covariance or array_like of float
+        Covariance of the merged channels
+
+    """
+    if noise is None:
+        return IdentityCovariance(len(channelList))
+    return noise(channelList)
+
+def asCovariance(covariance):
+    """Covariance object for a covariance matrix, using the cheapest form that represents it
+
+    Parameters
+    ----------
+    covariance : Covariance or array_like of float
+        Covariance of the merged channels
+
+    Returns
+    -------
+    Covariance
+        The covariance, unchanged if it already is a Covariance
+
+    """
+    if isinstance(covariance, Covariance):
+        return covariance
+
+    if sparse.issparse(covariance):
+        covariance = covariance.toarray()
+    covariance = np.asarray(covariance, dtype=float)
+
+    variances = covariance.diagonal()
+    if np.count_nonzero(covariance) == np.count_nonzero(variances):
+        if (variances == 1).all():
+            return IdentityCovariance(len(variances))
+        return DiagonalCovariance(variances)
+
+    return DenseCovariance(covariance)
@@ -1,4 +1,5 @@
 from collections import namedtuple
+import numpy as np
 
 # define data Structures
 Point = namedtuple('Point', ['x', 'y'])
@@ -21,6 +22,54 @@ PlaneInfo.sin.__doc__ = '''sin of the plane angle'''
 PlaneInfo.cos.__doc__ = '''cos of the plane angle'''
 PlaneInfo.gradient.__doc__ = '''gradient of the wires in plane'''
 
+class PlaneSet(list):
+    '''List of PlaneInfo that also holds the plane parameters as contiguous arrays
+
+    Every field of PlaneInfo is available as an array indexed by plane number
+    (e.g. planes.cos[planeNo]). Boundary k of any wire in plane p is the line
+    normals[p] . (x, y) = offsets[p] + pitch[p] * k. The set is built once per
+    detector and should not be modified afterwards, so that geometry derived
+    from it, like crossing transforms, can be cached on it.
+    '''
+
+    def __init__(self, planes=()):
+        super().__init__(planes)
+
+        self.angle = np.array([plane.angle for plane in self], dtype=float)
+        self.pitch = np.array([plane.pitch for plane in self], dtype=float)
+        self.noOfWires = np.array([plane.noOfWires for plane in self], dtype=int)
+        self.originTranslation = np.array([plane.originTranslation for plane in self], dtype=float)
+        self.sin = np.array([plane.sin for plane in self], dtype=float)
+        self.cos = np.array([plane.cos for plane in self], dtype=float)
+
+        #channel number of the first wire in every plane
+        self.channelOffsets = np.concatenate(([0], np.cumsum(self.noOfWires)[:-1])).astype(int)
+
+        #wire boundary line coefficients
+        self.normals = np.column_stack((self.cos, self.sin))
+        self.offsets = self.cos * self.originTranslation
+
+        self._crossingTransforms = {}
+
+    def crossingTransform(self, planeNo0, planeNo1):
+        '''Affine map from boundary numbers of two planes to the point where the boundaries cross
+
+        Computed on first use and cached, boundary k of plane planeNo0 crosses
+        boundary l of plane planeNo1 at transform . (k, l, 1).
+        '''
+        if (planeNo0, planeNo1) not in self._crossingTransforms:
+            (cos0, sin0), (cos1, sin1) = self.normals[[planeNo0, planeNo1]]
+            determinant = cos0 * sin1 - sin0 * cos1
+
+            #inverse of the matrix of the two normals
+            inverse = np.array([[sin1, -sin0], [-cos1, cos0]]) / determinant
+            pitches = self.pitch[[planeNo0, planeNo1]]
+            offsets = self.offsets[[planeNo0, planeNo1]]
+
+            self._crossingTransforms[(planeNo0, planeNo1)] = np.column_stack((inverse * pitches, inverse[:, 0] * offsets[0] + inverse[:, 1] * offsets[1]))
+
+        return self._crossingTransforms[(planeNo0, planeNo1)]
+
 DetectorVolume = namedtuple('DetectorVolume', ['width', 'height'])
 DetectorVolume.__doc__ = '''2D dimensions of the detector'''
 DetectorVolume.width.__doc__ = '''width of detector'''
@@ -36,3 +85,194 @@ Blob.__doc__ ='''Blob detected in tomographic slice'''
 Blob.charge.__doc__ ='''Charge Associated with the Blob'''
 Blob.wires.__doc__ = '''Wires that bind the Blob'''
 Blob.points.__doc__ ='''Points that define the ConvexHull of the blob'''
+
+SolverInfo = namedtuple('SolverInfo', ['solver', 'iterations', 'time', 'converged'])
+SolverInfo.__doc__ = '''Information about how a charge solve ran'''
+SolverInfo.solver.__doc__ = '''name of the solver used'''
+SolverInfo.iterations.__doc__ = '''number of iterations taken, None if not reported by the solver'''
+SolverInfo.time.__doc__ = '''wall time of the solve in seconds'''
+SolverInfo.converged.__doc__ = '''True if the solver converged'''
+
+Score = namedtuple('Score', ['correctID', 'fakeID', 'missedID', 'chargeResidual', 'correctFraction', 'fakeFraction'])
+Score.__doc__ = '''How well the charge solve identified the true cells, for one event or an array over events'''
+Score.correctID.__doc__ = '''number of cells with charge that have true charge'''
+Score.fakeID.__doc__ = '''number of cells with charge that have no true charge'''
+Score.missedID.__doc__ = '''number of cells with true charge that have no charge'''
+Score.chargeResidual.__doc__ = '''sum over cells of the absolute difference between solved and true charge'''
+Score.correctFraction.__doc__ = '''correctID per true blob'''
+Score.fakeFraction.__doc__ = '''fakeID per true blob'''
+
+class BlobTable(object):
+    '''Columnar table of blobs from one or more events
+
+    Blob i has charge charge[i], its two defining points are points[i]
+    (shape (2, 2), rows are points) and its merged wire in plane p runs from
+    wires[i, p, 0] to wires[i, p, 1]. The blobs of event e are the rows
+    eventOffsets[e] to eventOffsets[e + 1]. Indexing the table gives Blob,
+    whose points are a PointArray view of the table.
+    '''
+
+    def __init__(self, charge, points, wires, eventOffsets=None):
+        self.charge = np.asarray(charge, dtype=float).reshape(-1)
+        self.points = np.asarray(points, dtype=float).reshape(len(self.charge), 2, 2)
+        self.wires = np.asarray(wires, dtype=int)
+        if self.wires.ndim != 3:
+            self.wires = self.wires.reshape(len(self.charge), -1, 2)
+
+        if eventOffsets is None:
+            eventOffsets = [0, len(self.charge)]
+        self.eventOffsets = np.asarray(eventOffsets, dtype=int)
+
+    def __len__(self):
+        return len(self.charge)
+
+    def __getitem__(self, blobNo):
+        if isinstance(blobNo, slice):
+            return [self[i] for i in range(*blobNo.indices(len(self)))]
+
+        return Blob(float(self.charge[blobNo]),
+                    [(int(lower), int(upper)) for lower, upper in self.wires[blobNo]],
+                    PointArray(self.points[blobNo]))
+
+    def __iter__(self):
+        for blobNo in range(len(self)):
+            yield self[blobNo]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    @property
+    def noOfEvents(self):
+        '''number of events in the table'''
+        return len(self.eventOffsets) - 1
+
+    def event(self, eventNo):
+        '''BlobTable holding only the blobs of one event'''
+        start, stop = self.eventOffsets[eventNo], self.eventOffsets[eventNo + 1]
+
+        return BlobTable(self.charge[start:stop], self.points[start:stop], self.wires[start:stop])
+
+    def toBlobs(self):
+        '''list of Blob for all the blobs in the table'''
+        return list(self)
+
+    @classmethod
+    def fromBlobs(cls, blobs, noOfPlanes=None):
+        '''BlobTable for a single event from a list of Blob'''
+        if noOfPlanes is None:
+            noOfPlanes = len(blobs[0].wires) if blobs else 0
+
+        return cls([blob.charge for blob in blobs],
+                   np.array([[tuple(point) for point in blob.points] for blob in blobs], dtype=float).reshape(-1, 2, 2),
+                   np.array([blob.wires for blob in blobs], dtype=int).reshape(len(blobs), noOfPlanes, 2))
+
+class PointArray(object):
+    '''Points held as an (N, 2) array, standing in for a list of Point
+
+    Indexing gives Point, iterating gives every Point, and it compares equal
+    to a list of Point with the same coordinates. numpy functions see the
+    underlying array, which is shared, not copied.
+    '''
+
+    __slots__ = ('coordinates',)
+
+    def __init__(self, coordinates):
+        self.coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+
+    @property
+    def x(self):
+        '''x coordinate of every point'''
+        return self.coordinates[:, 0]
+
+    @property
+    def y(self):
+        '''y coordinate of every point'''
+        return self.coordinates[:, 1]
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def __getitem__(self, pointNo):
+        if isinstance(pointNo, slice):
+            return PointArray(self.coordinates[pointNo])
+
+        x, y = self.coordinates[pointNo].tolist()
+        return Point(x, y)
+
+    def __iter__(self):
+        for x, y in self.coordinates.tolist():
+            yield Point(x, y)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.coordinates if dtype is None else self.coordinates.astype(dtype)
+
+    def __eq__(self, other):
+        if isinstance(other, PointArray):
+            return self.coordinates.shape == other.coordinates.shape and bool((self.coordinates == other.coordinates).all())
+        try:
+            return list(self) == [tuple(point) for point in other]
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return 'PointArray(' + repr(self.coordinates.tolist()) + ')'
+
+    def toPoints(self):
+        '''list of Point for all the points'''
+        return list(self)
+
+class CellTable(object):
+    '''Columnar table of reconstructed cells
+
+    The binding wire of cell i in plane p runs from wires[i, p, 0] to
+    wires[i, p, 1]. The vertices of all the cells are stacked in vertices,
+    those of cell i being the rows offsets[i] to offsets[i + 1]. Indexing the
+    table gives Cell, whose points are a PointArray view of the vertices, and
+    it compares equal to a list of the same Cell.
+    '''
+
+    def __init__(self, wires, vertices, offsets):
+        self.offsets = np.asarray(offsets, dtype=int)
+        self.wires = np.asarray(wires, dtype=int)
+        if self.wires.ndim != 3:
+            self.wires = self.wires.reshape(len(self.offsets) - 1, -1, 2)
+        self.vertices = np.asarray(vertices, dtype=float).reshape(-1, 2)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, cellNo):
+        if isinstance(cellNo, slice):
+            return [self[i] for i in range(*cellNo.indices(len(self)))]
+        if cellNo < 0:
+            cellNo += len(self)
+
+        return Cell([(int(lower), int(upper)) for lower, upper in self.wires[cellNo]],
+                    PointArray(self.polygon(cellNo)))
+
+    def __iter__(self):
+        for cellNo in range(len(self)):
+            yield self[cellNo]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def polygon(self, cellNo):
+        '''vertices of one cell as an (N, 2) view'''
+        return self.vertices[self.offsets[cellNo]:self.offsets[cellNo + 1]]
+
+    def toCells(self):
+        '''list of Cell for all the cells in the table'''
+        return list(self)
+
+    @classmethod
+    def fromCells(cls, cells, noOfPlanes=None):
+        '''CellTable from a list of Cell'''
+        if noOfPlanes is None:
+            noOfPlanes = len(cells[0].wires) if cells else 0
+
+        polygons = [np.asarray([tuple(point) for point in cell.points], dtype=float).reshape(-1, 2) for cell in cells]
+
+        return cls(np.array([cell.wires for cell in cells], dtype=int).reshape(len(cells), noOfPlanes, 2),
+                   np.concatenate(polygons) if polygons else np.zeros((0, 2)),
+                   np.concatenate(([0], np.cumsum([len(polygon) for polygon in polygons]))))
@@ -12,6 +12,7 @@ import geometryReco
 import draw
 import matrixGeneration
 import chargeSolving
+import scoring
 
 def generateAngles(noOfPlanes):
     individualAngle = math.pi/noOfPlanes
@@ -116,13 +117,13 @@ def main(argv):
         geometryMatrixU, recoWireMatrixU = matrixGeneration.addUncertainity(geometryMatrix,recoWireMatrix,covarianceMatrix)
 
         recoCellMatrix = chargeSolving.solve(recoWireMatrixU, geometryMatrixU, alpha)
-        recoCells = list(map(lambda x: not math.isclose(x,0,rel_tol=1e-5),recoCellMatrix))
+        recoCells = scoring.cellFlags(recoCellMatrix).tolist()
         print("reco:x")
         print(recoCellMatrix)
 
         if trueBlobs:
             trueCellMatrix = matrixGeneration.generateTrueCellMatrix(blobs,cells)
-            trueCells = list(map(lambda x: not math.isclose(x,0,rel_tol=1e-5),trueCellMatrix))
+            trueCells = scoring.cellFlags(trueCellMatrix).tolist()
             print("x")
             print(trueCellMatrix)
 
@@ -1,15 +1,12 @@
 #External Dependencies
-import sys
 import math
-import numpy as np
 
 #Internal Dependencies
 from dataTypes import *
 import utilities
-import geometryGen
-import geometryReco
-import matrixGeneration
-import chargeSolving
+import pipeline
+import scoring
+import instrumentation
 
 def generateAngles(noOfPlanes):
     individualAngle = math.pi/noOfPlanes
@@ -21,37 +18,30 @@ def generateAngles(noOfPlanes):
     return angles
 
 
-def drive(volume, wirePitches, angles, noOfBlobs, alpha):
-    planes = utilities.generatePlaneInfo(wirePitches, volume, angles)
+#kept here as seeded events are usually replayed through the driver
+eventRng = utilities.eventRng
 
-    #Generating Random Blobs
-    blobs = geometryGen.generateBlobs(planes,volume, noOfBlobs)
+def reconstructedEvents(volume, wirePitches, angles, noOfBlobs, rng=None, recorder=instrumentation.nullRecorder):
+    """A single event pulled through the pipeline stages up to pipeline.buildMatrices"""
+    planes = utilities.getPlaneSet(wirePitches, volume, angles)
 
-    #Creating Event
-    event = geometryGen.generateEvent(planes,blobs)
-    #Merging Event
-    event = geometryGen.mergeEvent(event)
+    events = [pipeline.generateEvent(planes, volume, noOfBlobs, rng, recorder=recorder)]
+    events = pipeline.mergeEvents(events, recorder)
+    events = pipeline.reconstructEvents(events, recorder)
 
-    #reconstructing cells based on geometry information
-    cells = geometryReco.reconstructCells(planes,event)
+    return pipeline.buildMatrices(events, recorder=recorder)
 
-    #create matrix associating wires and cells
-    channelList, geometryMatrix = matrixGeneration.constructGeometryMatrix(planes, cells)
+def drive(volume, wirePitches, angles, noOfBlobs, alpha, solver="lasso", rng=None, recorder=instrumentation.nullRecorder):
+    blobs, cells, channelList, geometryMatrix, recoWireMatrix, recoCellMatrices, trueCellMatrix = drivePath(volume, wirePitches, angles, noOfBlobs, [alpha], solver, rng, recorder)
 
-    #covariance Matrix
-    covarianceMatrix = np.identity(len(channelList))
+    return blobs, cells, channelList, geometryMatrix, recoWireMatrix, recoCellMatrices[0], trueCellMatrix
 
-    #create Chrage Matrices
-    masterChargeList = matrixGeneration.constructChargeList(planes,blobs)
-    recoWireMatrix = matrixGeneration.measureCharge(channelList,masterChargeList)
+def drivePath(volume, wirePitches, angles, noOfBlobs, alphas, solver="lasso", rng=None, recorder=instrumentation.nullRecorder):
+    #solve every alpha on the same event, warm starting from the previous alpha
+    event = next(pipeline.solveEvents(reconstructedEvents(volume, wirePitches, angles, noOfBlobs, rng, recorder), alphas, solver, recorder))
+    recorder.endEvent()
 
-    #solve
-    geometryMatrixU, recoWireMatrixU = matrixGeneration.addUncertainity(geometryMatrix,recoWireMatrix,covarianceMatrix)
-
-    recoCellMatrix = chargeSolving.solve(recoWireMatrixU, geometryMatrixU, alpha)
-    trueCellMatrix = matrixGeneration.generateTrueCellMatrix(blobs,cells)
-
-    return blobs, cells, channelList, geometryMatrix, recoWireMatrix, recoCellMatrix, trueCellMatrix
+    return tuple(event[field] for field in ("blobs", "cells", "channelList", "geometryMatrix", "recoWireMatrix", "recoCellMatrices", "trueCellMatrix"))
 
 if __name__ == "__main__":
 
@@ -64,11 +54,10 @@ if __name__ == "__main__":
 
     blobs, cells, channelList, geometryMatrix, recoWireMatrix, recoCellMatrix, trueCellMatrix = drive(volume, wirePitches, angles, numberOfBlobs, alpha)
 
-    recoCells = list(map(lambda x: not math.isclose(x,0,rel_tol=1e-5),recoCellMatrix))
-    trueCells = list(map(lambda x: not math.isclose(x,0,rel_tol=1e-5),trueCellMatrix))
+    recoCells = scoring.cellFlags(recoCellMatrix).tolist()
+    trueCells = scoring.cellFlags(trueCellMatrix).tolist()
 
-    correctID = sum(bool(x[0]) and bool(x[1]) for x in zip(trueCells,recoCells))
-    fakeID = sum(not bool(x[0]) and bool(x[1]) for x in zip(trueCells,recoCells))
+    correctID, fakeID, missedID = scoring.countIdentifications(recoCellMatrix, trueCellMatrix)
 
     print("\033[93m","Number of true Blobs:",len(blobs),"\033[0m")
     print("\033[93m","Number of Cells:", len(cells),"\033[0m")
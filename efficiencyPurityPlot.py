@@ -7,43 +7,20 @@ from array import array
 
 # Internal Dependencies
 from dataTypes import *
-import driver
+import eventFarm
+import instrumentation
 import draw
 
-def efficiencyPurityGraph(volume, wirePitches, angles, numberOfBlobs, alphas, numberOfIterations):
+def efficiencyPurityGraph(volume, wirePitches, angles, numberOfBlobs, alphas, numberOfIterations, warmStart=False, solver="lasso", workers=1, seed=None, checkpoint=None, recorder=instrumentation.nullRecorder):
     efficiency = array('f', len(alphas) * [0.])
     purity = array('f', len(alphas) * [0.])
 
-    eventNo = 0
-    for pointNo, alpha in enumerate(alphas):
-        correctSum = 0
-        fakeSum = 0
+    correctSums, fakeSums = eventFarm.scanEfficiencyPurity(volume, wirePitches, angles, numberOfBlobs, alphas, numberOfIterations,
+                                                          workers=workers, seed=seed, warmStart=warmStart, solver=solver, checkpoint=checkpoint, recorder=recorder)
 
-        for i in range(numberOfIterations):
-            blobs, cells, channelList, geometryMatrix, recoWireMatrix, recoCellMatrix, trueCellMatrix = driver.drive(
-                volume, wirePitches, angles, numberOfBlobs, alpha)
-
-            if (eventNo % 1000 == 0) or (eventNo == 0):
-                print("Processed ", eventNo, "/", len(alphas)
-                      * numberOfIterations, " events")
-
-            eventNo += 1
-
-            recoCells = list(map(lambda x: not math.isclose(
-                x, 0, rel_tol=1e-5), recoCellMatrix))
-            trueCells = list(map(lambda x: not math.isclose(
-                x, 0, rel_tol=1e-5), trueCellMatrix))
-
-            correctID = sum(bool(x[0]) and bool(x[1])
-                            for x in zip(trueCells, recoCells))
-            fakeID = sum(not bool(x[0]) and bool(x[1])
-                         for x in zip(trueCells, recoCells))
-
-            correctSum += correctID / len(blobs)
-            fakeSum += fakeID / len(blobs)
-
-        efficiency[pointNo] = correctSum / numberOfIterations
-        purity[pointNo] = 1 - fakeSum / numberOfIterations
+    for pointNo in range(len(alphas)):
+        efficiency[pointNo] = correctSums[pointNo] / numberOfIterations
+        purity[pointNo] = 1 - fakeSums[pointNo] / numberOfIterations
 
     g = root.TGraph(len(alphas), efficiency, purity)
 
@@ -0,0 +1,283 @@
+# External Dependencies
+import os
+import json
+import time
+import multiprocessing
+import numpy as np
+
+# Internal Dependencies
+from dataTypes import *
+import pipeline
+import instrumentation
+
+def sumFractions(events, noOfAlphas, pointNos=None):
+    """Sum the correct and fake identification fractions of scored events
+
+    Parameters
+    ----------
+    events : iterable of dict
+        Events with correctFractions and fakeFractions, as made by pipeline.scoreEvents
+    noOfAlphas : int
+        Number of regularization strengths of the scan
+    pointNos : list of int
+        Alphas the fractions of every event are for, all of them if None
+
+    Returns
+    -------
+    np.ndarray, np.ndarray
+        Sum of correct fractions and of fake fractions for every alpha
+
+    """
+    if pointNos is None:
+        pointNos = list(range(noOfAlphas))
+
+    correctSums = np.zeros(noOfAlphas)
+    fakeSums = np.zeros(noOfAlphas)
+
+    for event in events:
+        correctSums[pointNos] += event["correctFractions"]
+        fakeSums[pointNos] += event["fakeFractions"]
+
+    return correctSums, fakeSums
+
+def mapChunks(chunkFunction, chunks, workers):
+    """Run chunkFunction on every chunk, spread over a process pool
+
+    Parameters
+    ----------
+    chunkFunction : callable
+        Function of a module level, so it can be sent to the worker processes
+    chunks : list
+        Work units, each passed to chunkFunction on its own
+    workers : int
+        Number of processes, in this process if 1
+
+    Yields
+    ------
+    object
+        Result of chunkFunction for every chunk, in the order of chunks. If the caller raises
+        or closes the generator the pool is terminated instead of finishing the remaining chunks
+
+    """
+    pool = multiprocessing.Pool(workers) if workers > 1 and len(chunks) > 1 else None
+    completed = False
+    try:
+        for result in (pool.imap(chunkFunction, chunks) if pool else map(chunkFunction, chunks)):
+            yield result
+        completed = True
+    finally:
+        #chunks still queued are dropped if the caller raised or stopped early
+        if pool:
+            if completed:
+                pool.close()
+            else:
+                pool.terminate()
+            pool.join()
+
+def runChunk(task):
+    """Generate, reconstruct and score a contiguous range of events
+
+    Parameters
+    ----------
+    task : tuple
+        (volume, wirePitches, angles, numberOfBlobs, alphas, alphaNo, start, stop, seed, solver, record).
+        If alphaNo is None every event is solved for all alphas, else only for alphas[alphaNo].
+        If record is True every stage of every event is recorded by an instrumentation.Recorder
+
+    Returns
+    -------
+    np.ndarray, np.ndarray, int, list of dict
+        Sum of correct fractions and of fake fractions for every alpha, number of events processed,
+        records of the events, empty if not recorded
+
+    """
+    volume, wirePitches, angles, numberOfBlobs, alphas, alphaNo, start, stop, seed, solver, record = task
+
+    recorder = instrumentation.Recorder() if record else instrumentation.nullRecorder
+
+    if alphaNo is None:
+        events = pipeline.run(volume, wirePitches, angles, numberOfBlobs, alphas, range(start, stop), seed, solver, recorder=recorder)
+        pointNos = None
+    else:
+        events = pipeline.run(volume, wirePitches, angles, numberOfBlobs, [alphas[alphaNo]], range(start, stop), seed, solver, streamKey=(alphaNo,), recorder=recorder)
+        pointNos = [alphaNo]
+
+    correctSums, fakeSums = sumFractions(events, len(alphas), pointNos)
+
+    records = recorder.events if record else []
+    #events of different alphas share their numbers without a warm start
+    if alphaNo is not None:
+        for eventRecord in records:
+            eventRecord["alphaNo"] = alphaNo
+
+    return correctSums, fakeSums, stop - start, records
+
+def makeChunks(volume, wirePitches, angles, numberOfBlobs, alphas, numberOfIterations, chunkSize, seed, warmStart, solver, record=False):
+    """Split a scan into work units for runChunk
+
+    Chunks only depend on the scan parameters, never on the number of workers,
+    so the order in which partial sums are added up is always the same.
+    """
+    alphaNos = [None] if warmStart else range(len(alphas))
+
+    return [(volume, wirePitches, angles, numberOfBlobs, list(alphas), alphaNo, start, min(start + chunkSize, numberOfIterations), seed, solver, record)
+            for alphaNo in alphaNos for start in range(0, numberOfIterations, chunkSize)]
+
+def encodeSeed(seed):
+    """Seed of a scan in a form that can be stored as JSON"""
+    if isinstance(seed, np.random.SeedSequence):
+        return {"entropy": seed.entropy, "spawnKey": list(seed.spawn_key)}
+    return int(seed)
+
+def decodeSeed(seed):
+    """Seed of a scan stored by encodeSeed"""
+    if isinstance(seed, dict):
+        return np.random.SeedSequence(seed["entropy"], spawn_key=tuple(seed["spawnKey"]))
+    return seed
+
+def scanSettings(volume, wirePitches, angles, numberOfBlobs, alphas, numberOfIterations, chunkSize, seed, warmStart, solver):
+    """Everything the results of a scan depend on, stored with its checkpoints"""
+    return {
+        "volume": [float(length) for length in volume],
+        "wirePitches": [float(pitch) for pitch in wirePitches],
+        "angles": [float(angle) for angle in angles],
+        "numberOfBlobs": int(numberOfBlobs),
+        "alphas": [float(alpha) for alpha in alphas],
+        "numberOfIterations": int(numberOfIterations),
+        "chunkSize": int(chunkSize),
+        "seed": encodeSeed(seed),
+        "warmStart": bool(warmStart),
+        "solver": solver,
+    }
+
+def saveCheckpoint(path, settings, completedChunks, correctSums, fakeSums):
+    """Atomically store the partial sums of the chunks of a scan completed so far
+
+    The checkpoint is written next to path and moved over it, so an
+    interrupted write leaves the previous checkpoint in place.
+
+    Parameters
+    ----------
+    path : str
+        JSON file of the checkpoint
+    settings : dict
+        Settings of the scan, see scanSettings
+    completedChunks : int
+        Number of chunks, in the order of makeChunks, added to the sums
+    correctSums : np.ndarray
+        Sum of correct fractions for every alpha
+    fakeSums : np.ndarray
+        Sum of fake fractions for every alpha
+
+    """
+    temporaryPath = path + ".tmp"
+    with open(temporaryPath, "w") as outputFile:
+        json.dump({"settings": settings, "completedChunks": completedChunks,
+                   "correctSums": np.asarray(correctSums).tolist(), "fakeSums": np.asarray(fakeSums).tolist()}, outputFile)
+        outputFile.flush()
+        os.fsync(outputFile.fileno())
+
+    os.replace(temporaryPath, path)
+
+def loadCheckpoint(path):
+    """Checkpoint stored by saveCheckpoint, None if there is none
+
+    Returns
+    -------
+    dict
+        settings, completedChunks, correctSums and fakeSums of the scan
+
+    """
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as inputFile:
+        return json.load(inputFile)
+
+def scanEfficiencyPurity(volume, wirePitches, angles, numberOfBlobs, alphas, numberOfIterations, workers=None, chunkSize=100, seed=None, warmStart=True, solver="lasso",
+                         checkpoint=None, checkpointInterval=60.0, recorder=instrumentation.nullRecorder):
+    """Sum correct and fake identification fractions over many events, spread over a process pool
+
+    Parameters
+    ----------
+    volume : DetectorVolume
+        The width and height of the detector
+    wirePitches : list of float
+        Wire pitch of every plane
+    angles : list of float
+        Angle of every plane in radians
+    numberOfBlobs : int
+        Number of true blobs in every event
+    alphas : list of float
+        Regularization strengths
+    numberOfIterations : int
+        Number of events for every alpha
+    workers : int
+        Number of processes, all cores if None and in this process if 1
+    chunkSize : int
+        Number of events in a work unit
+    seed : int or np.random.SeedSequence
+        Seed of the scan, event i of alpha k is generated from utilities.eventRng(seed, i) with a warm start
+        and utilities.eventRng(seed, k, i) without. Results are identical for the same seed whatever the number of workers. Random if None
+    warmStart : Boolean
+        Solve every event for all alphas instead of generating fresh events for each alpha
+    solver : str
+        Name of the solver in chargeSolving.solvers to use
+    checkpoint : str
+        JSON file the partial sums are stored in while the scan runs. If it exists the scan resumes from it,
+        reusing its seed if seed is None, and raises ValueError if it was made with other settings
+    checkpointInterval : float
+        Seconds between checkpoints, the last one is always written
+    recorder : instrumentation.Recorder
+        Receives the records of every event, made in the worker processes and added in chunk order.
+        Events of chunks completed before a checkpoint was resumed are not recorded
+
+    Returns
+    -------
+    list of float, list of float
+        Sum of correct fractions and of fake fractions for every alpha
+
+    """
+    stored = loadCheckpoint(checkpoint) if checkpoint else None
+
+    if seed is None:
+        seed = decodeSeed(stored["settings"]["seed"]) if stored else np.random.SeedSequence()
+    if workers is None:
+        workers = os.cpu_count()
+
+    chunks = makeChunks(volume, wirePitches, angles, numberOfBlobs, alphas, numberOfIterations, chunkSize, seed, warmStart, solver, recorder.enabled)
+    totalEvents = numberOfIterations if warmStart else len(alphas) * numberOfIterations
+    settings = scanSettings(volume, wirePitches, angles, numberOfBlobs, alphas, numberOfIterations, chunkSize, seed, warmStart, solver)
+
+    correctSums = np.zeros(len(alphas))
+    fakeSums = np.zeros(len(alphas))
+    completedChunks = 0
+
+    #sums are added up in chunk order, so resuming gives the same result as an uninterrupted scan
+    if stored:
+        if stored["settings"] != settings:
+            raise ValueError("Checkpoint " + repr(checkpoint) + " was made by a scan with other settings")
+        completedChunks = stored["completedChunks"]
+        correctSums += stored["correctSums"]
+        fakeSums += stored["fakeSums"]
+        print("Resuming from ", completedChunks, "/", len(chunks), " chunks")
+
+    eventNo = sum(chunk[7] - chunk[6] for chunk in chunks[:completedChunks])
+    lastCheckpoint = time.monotonic()
+
+    #partial sums arrive in chunk order and are added up as they come
+    for chunkCorrect, chunkFake, noOfEvents, records in mapChunks(runChunk, chunks[completedChunks:], workers):
+        correctSums += chunkCorrect
+        fakeSums += chunkFake
+        recorder.merge(records)
+        completedChunks += 1
+
+        if eventNo // 1000 != (eventNo + noOfEvents) // 1000 or eventNo == 0:
+            print("Processed ", eventNo + noOfEvents, "/", totalEvents, " events")
+        eventNo += noOfEvents
+
+        if checkpoint and (time.monotonic() - lastCheckpoint >= checkpointInterval or completedChunks == len(chunks)):
+            saveCheckpoint(checkpoint, settings, completedChunks, correctSums, fakeSums)
+            lastCheckpoint = time.monotonic()
+
+    return correctSums.tolist(), fakeSums.tolist()
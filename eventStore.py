@@ -0,0 +1,295 @@
+# External Dependencies
+import os
+import json
+import shutil
+import numpy as np
+from scipy import sparse
+
+# Internal Dependencies
+from dataTypes import *
+import utilities
+
+#version of the layout written by EventWriter
+formatVersion = 1
+
+#columns of integers, every other column holds floats
+integerColumns = ("eventNos", "blobWires", "blobOffsets", "mergedWires", "mergedOffsets", "cellWires", "cellVertexOffsets", "cellOffsets",
+                  "channels", "channelOffsets", "geometryIndices", "geometryIndptr")
+
+#fields of an event that are stored, as named by pipeline
+storedFields = ("blobs", "event", "cells", "channelList", "geometryMatrix", "recoWireMatrix", "trueCellMatrix")
+
+#columns of the store, every one a .npy file in the store directory
+columns = ("eventNos", "blobCharge", "blobPoints", "blobWires", "blobOffsets", "mergedWires", "mergedOffsets",
+           "cellWires", "cellVertices", "cellVertexOffsets", "cellOffsets", "channels", "channelOffsets",
+           "geometryData", "geometryIndices", "geometryIndptr", "recoWireCharges", "trueCellCharges")
+
+#kind of row counted by every offsets column
+offsetColumns = {"blobOffsets": "blob", "mergedOffsets": "merged", "cellVertexOffsets": "cellVertex", "cellOffsets": "cell",
+                 "channelOffsets": "channel", "geometryIndptr": "geometry"}
+
+class EventWriter(object):
+    """Writes events to a store directory in chunks
+
+    Every column holds the rows of all the events one after the other, the
+    rows of event e in a column being given by the matching offsets column:
+    blobs by blobOffsets, merged wires of plane p by mergedOffsets[e * P + p],
+    cells and true cell charges by cellOffsets, channels, measured charges and
+    geometry matrix rows by channelOffsets. Cell vertices and the geometry
+    matrix use global offsets (cellVertexOffsets, geometryIndptr) over all cells and
+    channels.
+
+    Rows are appended to a raw .part file per column every flushEvery events,
+    so only that many events are held in memory. close gives every column its
+    .npy header and writes the description of the store, which is only
+    readable after it. Leaving a with block closes the writer even on an
+    exception, keeping the events appended so far.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the store, created if it doesn't exist
+    volume : DetectorVolume
+        The width and height of the detector
+    wirePitches : list of float
+        Wire pitch of every plane
+    angles : list of float
+        Angle of every plane in radians
+    flushEvery : int
+        Number of events held in memory before they are written out
+    """
+
+    def __init__(self, path, volume, wirePitches, angles, flushEvery=1000):
+        self.path = path
+        self.volume = volume
+        self.wirePitches = [float(pitch) for pitch in wirePitches]
+        self.angles = [float(angle) for angle in angles]
+        self.noOfPlanes = len(self.wirePitches)
+        self.flushEvery = flushEvery
+        self.noOfEvents = 0
+        self.closed = False
+
+        #shape of a row of every column that isn't a single number
+        self.rowShapes = {"blobPoints": (2, 2), "blobWires": (self.noOfPlanes, 2), "mergedWires": (2,), "cellWires": (self.noOfPlanes, 2),
+                          "cellVertices": (2,), "channels": (2,)}
+        self.dtypes = {column: np.dtype(int if column in integerColumns else float) for column in columns}
+        self.rows = dict.fromkeys(columns, 0)
+        self.totals = dict.fromkeys(offsetColumns, 0)
+        self.buffers = {column: [] for column in columns}
+        for column in offsetColumns:
+            self.buffers[column].append(np.zeros(1, dtype=int))
+
+        os.makedirs(path, exist_ok=True)
+        self.partFiles = {column: open(os.path.join(path, column + ".part"), "wb") for column in columns}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def _addCounts(self, column, counts):
+        """Add the offsets after rows of the given counts to an offsets column"""
+        ends = self.totals[column] + np.cumsum(counts, dtype=int)
+        if len(ends):
+            self.totals[column] = int(ends[-1])
+        return ends
+
+    def append(self, event):
+        """Add an event
+
+        Parameters
+        ----------
+        event : dict
+            Event with eventNo and every field in storedFields, as made by the pipeline stages
+            up to pipeline.buildMatrices
+
+        """
+        if self.closed:
+            raise ValueError("Event store " + repr(self.path) + " is already closed")
+        if len(event["event"]) != self.noOfPlanes:
+            raise ValueError("Event " + str(event["eventNo"]) + " has " + str(len(event["event"])) + " planes, the store has " + str(self.noOfPlanes))
+
+        blobs = event["blobs"]
+        if not isinstance(blobs, BlobTable):
+            blobs = BlobTable.fromBlobs(blobs, self.noOfPlanes)
+        cells = event["cells"]
+        if not isinstance(cells, CellTable):
+            cells = CellTable.fromCells(cells, self.noOfPlanes)
+        geometryMatrix = sparse.csr_matrix(event["geometryMatrix"])
+
+        #every row of the event is gathered before any is added, so a failure leaves no partial event
+        rows = {
+            "eventNos": [event["eventNo"]],
+            "blobCharge": blobs.charge,
+            "blobPoints": blobs.points,
+            "blobWires": blobs.wires,
+            "mergedWires": np.concatenate([np.array(plane, dtype=int).reshape(-1, 2) for plane in event["event"]]),
+            "cellWires": cells.wires,
+            "cellVertices": cells.vertices,
+            "channels": event["channelList"],
+            "geometryData": geometryMatrix.data,
+            "geometryIndices": geometryMatrix.indices,
+            "recoWireCharges": event["recoWireMatrix"],
+            "trueCellCharges": event["trueCellMatrix"],
+        }
+        rows = {column: np.array(data, dtype=self.dtypes[column]).reshape((-1,) + self.rowShapes.get(column, ())) for column, data in rows.items()}
+        counts = {
+            "blobOffsets": [len(blobs)],
+            "mergedOffsets": [len(plane) for plane in event["event"]],
+            "cellVertexOffsets": np.diff(cells.offsets),
+            "cellOffsets": [len(cells)],
+            "channelOffsets": [len(rows["channels"])],
+            "geometryIndptr": np.diff(geometryMatrix.indptr),
+        }
+
+        for column, data in rows.items():
+            self.buffers[column].append(data)
+        for column, columnCounts in counts.items():
+            self.buffers[column].append(self._addCounts(column, columnCounts))
+
+        self.noOfEvents += 1
+        if self.noOfEvents % self.flushEvery == 0:
+            self.flush()
+
+    def flush(self):
+        """Write the rows of the events held in memory to the .part files"""
+        for column, parts in self.buffers.items():
+            if parts:
+                data = np.ascontiguousarray(np.concatenate(parts), dtype=self.dtypes[column])
+                self.partFiles[column].write(data.tobytes())
+                self.rows[column] += len(data)
+                parts.clear()
+
+    def close(self):
+        """Write the rest of the events, turn every .part file into a .npy column and write the description of the store"""
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+
+        for column in columns:
+            self.partFiles[column].close()
+            partPath = os.path.join(self.path, column + ".part")
+
+            header = {"descr": np.lib.format.dtype_to_descr(self.dtypes[column]), "fortran_order": False,
+                      "shape": (self.rows[column],) + self.rowShapes.get(column, ())}
+            with open(os.path.join(self.path, column + ".npy"), "wb") as outputFile, open(partPath, "rb") as partFile:
+                np.lib.format.write_array_header_1_0(outputFile, header)
+                shutil.copyfileobj(partFile, outputFile)
+            os.remove(partPath)
+
+        description = {"version": formatVersion, "noOfEvents": self.noOfEvents, "volume": [float(length) for length in self.volume],
+                       "wirePitches": self.wirePitches, "angles": self.angles}
+        with open(os.path.join(self.path, "store.json"), "w") as outputFile:
+            json.dump(description, outputFile, indent=2)
+
+def writeEvents(path, events, volume, wirePitches, angles, flushEvery=1000):
+    """Write events to a store directory
+
+    Events are usually the output of pipeline.buildMatrices, e.g.
+    pipeline.buildMatrices(pipeline.reconstructEvents(pipeline.mergeEvents(pipeline.generateEvents(...))))
+
+    Parameters
+    ----------
+    path : str
+        Directory of the store
+    events : iterable of dict
+        Events with eventNo and every field in storedFields
+    volume : DetectorVolume
+        The width and height of the detector
+    wirePitches : list of float
+        Wire pitch of every plane
+    angles : list of float
+        Angle of every plane in radians
+    flushEvery : int
+        Number of events held in memory before they are written out
+
+    Returns
+    -------
+    int
+        Number of events written
+
+    """
+    with EventWriter(path, volume, wirePitches, angles, flushEvery) as writer:
+        for event in events:
+            writer.append(event)
+
+    return writer.noOfEvents
+
+class EventStore(object):
+    """Events of a store directory, read lazily by index
+
+    Columns are memory mapped, so opening a store reads nothing but its
+    description and indexing it only reads the rows of that event.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the store written by EventWriter
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "store.json")) as inputFile:
+            description = json.load(inputFile)
+
+        if description["version"] != formatVersion:
+            raise ValueError("Event store " + repr(path) + " has version " + str(description["version"]) + ", expected " + str(formatVersion))
+
+        self.volume = DetectorVolume(*description["volume"])
+        self.wirePitches = description["wirePitches"]
+        self.angles = description["angles"]
+        self.noOfPlanes = len(self.wirePitches)
+        self.planes = utilities.getPlaneSet(self.wirePitches, self.volume, self.angles)
+        self.columns = {column: np.load(os.path.join(path, column + ".npy"), mmap_mode="r") for column in columns}
+        self.noOfEvents = description["noOfEvents"]
+
+    def __len__(self):
+        return self.noOfEvents
+
+    def __iter__(self):
+        for eventNo in range(len(self)):
+            yield self[eventNo]
+
+    def _rows(self, column, index):
+        offsets = self.columns[column]
+        return int(offsets[index]), int(offsets[index + 1])
+
+    def __getitem__(self, index):
+        """Event stored at index, with eventNo, planes and every field in storedFields"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("event " + str(index) + " out of range for a store of " + str(len(self)) + " events")
+        columns = self.columns
+
+        blobStart, blobStop = self._rows("blobOffsets", index)
+        blobs = BlobTable(columns["blobCharge"][blobStart:blobStop], columns["blobPoints"][blobStart:blobStop], columns["blobWires"][blobStart:blobStop])
+
+        event = []
+        for planeNo in range(self.noOfPlanes):
+            start, stop = self._rows("mergedOffsets", index * self.noOfPlanes + planeNo)
+            event.append([(int(first), int(last)) for first, last in columns["mergedWires"][start:stop].tolist()])
+
+        cellStart, cellStop = self._rows("cellOffsets", index)
+        vertexOffsets = np.asarray(columns["cellVertexOffsets"][cellStart:cellStop + 1])
+        cells = CellTable(columns["cellWires"][cellStart:cellStop], columns["cellVertices"][vertexOffsets[0]:vertexOffsets[-1]], vertexOffsets - vertexOffsets[0])
+
+        channelStart, channelStop = self._rows("channelOffsets", index)
+        indptr = np.asarray(columns["geometryIndptr"][channelStart:channelStop + 1])
+        #copied, as scipy may modify the arrays of a sparse matrix in place
+        geometryMatrix = sparse.csr_matrix((np.array(columns["geometryData"][indptr[0]:indptr[-1]]), np.array(columns["geometryIndices"][indptr[0]:indptr[-1]]), indptr - indptr[0]),
+                                           shape=(channelStop - channelStart, cellStop - cellStart))
+
+        return {
+            "eventNo": int(columns["eventNos"][index]),
+            "planes": self.planes,
+            "blobs": blobs,
+            "event": event,
+            "cells": cells,
+            "channelList": [(int(first), int(last)) for first, last in columns["channels"][channelStart:channelStop].tolist()],
+            "geometryMatrix": geometryMatrix,
+            "recoWireMatrix": np.matrix(columns["recoWireCharges"][channelStart:channelStop]).T,
+            "trueCellMatrix": np.matrix(columns["trueCellCharges"][cellStart:cellStop]).T,
+        }
@@ -1,7 +1,6 @@
 
 #External Dependencies
 import sys
-import math
 import numpy as np
 import ROOT as root
 from array import array
@@ -9,6 +8,7 @@ from array import array
 #Internal Dependencies
 from dataTypes import *
 import driver
+import scoring
 
 def main(argv):
     volume = DetectorVolume(1000.0, 1000.0)
@@ -19,6 +19,7 @@ def main(argv):
     alphas = [0.01]
 
     numberOfIterations = 100
+    seed = 0
 
     for numberOfBlobs in numbersOfBlobs:
         for alpha in alphas:
@@ -27,19 +28,12 @@ def main(argv):
             correctFractions = root.TH1F("correctFractions", ("Correct Identification Fraction"), 100, -0.1, 1.1)
             fakeFractions = root.TH1F("fakeFractions", ("Fake Identification Fraction"), 100, -0.1, 1.1)
             for i in range(numberOfIterations):
-                blobs, cells, channelList, geometryMatrix, recoWireMatrix, recoCellMatrix, trueCellMatrix = driver.drive(volume, wirePitches, angles, numberOfBlobs, alpha)
+                blobs, cells, channelList, geometryMatrix, recoWireMatrix, recoCellMatrix, trueCellMatrix = driver.drive(volume, wirePitches, angles, numberOfBlobs, alpha, rng=driver.eventRng(seed, i))
 
-                recoCells = list(map(lambda x: not math.isclose(x,0,rel_tol=1e-5),recoCellMatrix))
-                trueCells = list(map(lambda x: not math.isclose(x,0,rel_tol=1e-5),trueCellMatrix))
+                score = scoring.scoreEvent(recoCellMatrix, trueCellMatrix, len(blobs))
 
-                correctID = sum(bool(x[0]) and bool(x[1]) for x in zip(trueCells,recoCells))
-                fakeID = sum(not bool(x[0]) and bool(x[1]) for x in zip(trueCells,recoCells))
-
-                correctFraction = correctID/len(blobs)
-                fakeFraction = fakeID/len(blobs)
-
-                correctFractions.Fill(correctFraction)
-                fakeFractions.Fill(fakeFraction)
+                correctFractions.Fill(score.correctFraction)
+                fakeFractions.Fill(score.fakeFraction)
 
             correctFractions.SetTitle("")
             correctFractions.GetYaxis().SetTitleSize(0.04)
@@ -1,12 +1,41 @@
 #External Dependencies
 import numpy as np
-import itertools
-import math
 
 #Internal Dependencies
 from dataTypes import *
 import utilities
 
+def mergeIntervals(intervals):
+    """Union of closed wire intervals, touching intervals are merged
+
+    Parameters
+    ----------
+    intervals : array_like of shape (N, 2) of int
+        First and last primitive wire of every interval
+
+    Returns
+    -------
+    np.ndarray of shape (M, 2) of int
+        Sorted, disjoint merged wires covering the same primitive wires
+
+    """
+    intervals = np.asarray(intervals, dtype=int).reshape(-1, 2)
+    if len(intervals) == 0:
+        return intervals
+
+    intervals = intervals[np.argsort(intervals[:, 0], kind="stable")]
+    reach = np.maximum.accumulate(intervals[:, 1])
+
+    #a merged wire starts wherever an interval starts past every wire seen so far plus one
+    newWire = np.empty(len(intervals), dtype=bool)
+    newWire[0] = True
+    newWire[1:] = intervals[1:, 0] > reach[:-1] + 1
+
+    starts = np.flatnonzero(newWire)
+    stops = np.append(starts[1:], len(intervals)) - 1
+
+    return np.column_stack((intervals[starts, 0], reach[stops]))
+
 def createMergedWires(firedWirePrimitives):
     """Merged wires from a list of fired wire primitives
 
@@ -21,12 +50,9 @@ def createMergedWires(firedWirePrimitives):
         Merged Wire
 
     """
-    firedWirePrimitives = sorted(set(firedWirePrimitives))
-    gaps = [[s, e] for s, e in zip(
-        firedWirePrimitives, firedWirePrimitives[1:]) if s + 1 < e]
-    edges = iter(firedWirePrimitives[:1] +
-                 sum(gaps, []) + firedWirePrimitives[-1:])
-    return list(zip(edges, edges))
+    firedWirePrimitives = np.fromiter(firedWirePrimitives, dtype=int)
+
+    return [(int(first), int(last)) for first, last in mergeIntervals(np.column_stack((firedWirePrimitives, firedWirePrimitives)))]
 
 def mergeEvent(event):
     """Create Merged wires from list of wire primitives
@@ -48,57 +74,83 @@ def mergeEvent(event):
 
     return mergedEvent
 
-def generateBlobs(planes,volume, numberOfBlobs):
-    """Generate random true blobs
+def generateBlobTable(planes, volume, numberOfBlobs, rng=None, numberOfEvents=None):
+    """Generate random true blobs for one or many events at once
 
     Parameters
     ----------
-    planes : list of PlaneInfo
+    planes : list of PlaneInfo or PlaneSet
         A list containing information for all the planes in the detector
     volume : DetectorVolume
         The width and height of the detector
+    numberOfBlobs : int
+        Number of blobs to generate in every event
+    rng : np.random.Generator, np.random.SeedSequence or int
+        Source of random numbers, the global numpy random state if None
+    numberOfEvents : int
+        Number of events to generate, a single event if None
 
     Returns
     -------
-    list of Blob
-        A list of all the blobs in the event
+    BlobTable
+        All the blobs generated, grouped by event
 
     """
-    blobs = []
+    planes = utilities.asPlaneSet(planes)
+    rng = np.random if rng is None else np.random.default_rng(rng)
+    noOfEvents = 1 if numberOfEvents is None else numberOfEvents
+    noOfBlobs = noOfEvents * numberOfBlobs
 
-    #Arbitrary number of blobs from 2 to 15
-    for i in range(0,numberOfBlobs):
-        point0 = Point(np.random.random_sample() * volume.width,
-                       np.random.random_sample() * volume.height)
+    #every blob draws x0, y0, x offset, y offset
+    uniforms = rng.random((noOfBlobs, 4))
 
-        #30 set as arbitrary max length of blob
-        xOffset = point0.x + np.random.random_sample() * 30
-        yOffset = point0.y + np.random.random_sample() * 30
+    points = np.empty((noOfBlobs, 2, 2))
+    points[:, 0, 0] = uniforms[:, 0] * volume.width
+    points[:, 0, 1] = uniforms[:, 1] * volume.height
 
-        if xOffset > volume.width:
-            xOffset = volume.width
-        if yOffset > volume.height:
-            yOffset = volume.height
+    #30 set as arbitrary max length of blob
+    points[:, 1, 0] = np.minimum(points[:, 0, 0] + uniforms[:, 2] * 30, volume.width)
+    points[:, 1, 1] = np.minimum(points[:, 0, 1] + uniforms[:, 3] * 30, volume.height)
 
-        point1 = Point(xOffset, yOffset)
+    #charge calculations
+    meanCharge = np.hypot(points[:, 1, 0] - points[:, 0, 0], points[:, 1, 1] - points[:, 0, 1])
+    sigmaCharge = np.sqrt(meanCharge)
+    charge = rng.normal(meanCharge, sigmaCharge)
 
+    #merged wire of every blob is the range between the wires of its two points
+    wireNos = utilities.wireNumbersFromPoints(planes, points.reshape(-1, 2)).reshape(noOfBlobs, 2, len(planes))
+    wires = np.stack((wireNos.min(axis=1), wireNos.max(axis=1)), axis=-1)
 
-        #charge calculations
-        meanCharge = math.sqrt((point1.x-point0.x)*(point1.x-point0.x)+(point1.y-point0.y)*(point1.y-point0.y))
-        sigmaCharge = math.sqrt(meanCharge)
-        # meanCharge, sigmaCharge = 5, 0.5
-        charge = np.random.normal(meanCharge, sigmaCharge)
+    return BlobTable(charge, points, wires, np.arange(noOfEvents + 1) * numberOfBlobs)
 
-        blobs.append(Blob(charge, list(itertools.chain(*mergeEvent(utilities.fireWires(planes,[point0,point1])))), [point0,point1]))
+def generateBlobs(planes,volume, numberOfBlobs, rng=None):
+    """Generate random true blobs
 
-    return blobs
+    Parameters
+    ----------
+    planes : list of PlaneInfo or PlaneSet
+        A list containing information for all the planes in the detector
+    volume : DetectorVolume
+        The width and height of the detector
+    numberOfBlobs : int
+        Number of blobs to generate
+    rng : np.random.Generator, np.random.SeedSequence or int
+        Source of random numbers, the global numpy random state if None
+
+    Returns
+    -------
+    list of Blob
+        A list of all the blobs in the event
+
+    """
+    return generateBlobTable(planes, volume, numberOfBlobs, rng).toBlobs()
 
 def generateEvent(planes, blobs):
     """Generate List of wire primitives that were fired based on true blobs
 
     Parameters
     ----------
-    planes : list of PlaneInfo
+    planes : list of PlaneInfo or PlaneSet
         A list containing information for all the planes in the detector
     blobs : list of Blob
         A list containing true blobs in event
@@ -109,6 +161,7 @@ def generateEvent(planes, blobs):
         Primitive fired wires from every plane
 
     """
+    planes = utilities.asPlaneSet(planes)
     event = []
     for blobNo, blob in enumerate(blobs):
         wires = utilities.fireWires(planes, blob.points)
@@ -118,3 +171,40 @@ def generateEvent(planes, blobs):
         event = [set(item[0]).union(item[1])
                  for item in list(zip(event, wires))]
     return event
+
+def generateIntervalEvent(planes, blobs):
+    """Generate the wire intervals fired by every true blob, without expanding them into wire primitives
+
+    Parameters
+    ----------
+    planes : list of PlaneInfo or PlaneSet
+        A list containing information for all the planes in the detector
+    blobs : list of Blob or BlobTable
+        A list containing true blobs in event
+
+    Returns
+    -------
+    list of np.ndarray of shape (N, 2) of int
+        First and last primitive wire fired by every blob, sorted by first wire, for every plane
+
+    """
+    if not isinstance(blobs, BlobTable):
+        blobs = BlobTable.fromBlobs(blobs, len(planes))
+
+    return [blobs.wires[np.argsort(blobs.wires[:, planeNo, 0], kind="stable"), planeNo] for planeNo in range(len(planes))]
+
+def mergeIntervalEvent(intervalEvent):
+    """Create Merged wires from the wire intervals of every plane
+
+    Parameters
+    ----------
+    intervalEvent : list of array_like of shape (N, 2) of int
+        Fired wire intervals of every plane
+
+    Returns
+    -------
+    list of list of tuple[2] of ints
+        Merged Event
+
+    """
+    return [[(int(first), int(last)) for first, last in mergeIntervals(plane)] for plane in intervalEvent]
@@ -1,11 +1,15 @@
 #External Dependencies
 from scipy.spatial import ConvexHull
+import numpy as np
 import itertools
 
 #Internal Dependencies
 from dataTypes import *
-import geometryGen
 import utilities
+import instrumentation
+
+#tolerance below which a point is taken to be on a wire boundary (in wire coordinates) or a region to have no area
+clipTolerance = 1e-9
 
 def makeLines(plane, wire):
     """Create lines based on a merged wire
@@ -68,6 +72,39 @@ def lineIntersection(line0, line1):
                                                                                                                                  line1.point0.y * line1.point1.x)) / ((line0.point0.x - line0.point1.x) * (line1.point0.y - line1.point1.y) - (line0.point0.y - line0.point1.y) * (line1.point0.x - line1.point1.x))
     return Point(px, py)
 
+def wireCrossings(planes, planeNo0, boundaries0, planeNo1, boundaries1):
+    """Points where wire boundaries of two planes cross
+
+    Boundaries of two planes form a fixed lattice, so the crossings are a
+    single affine map of the boundary numbers, cached per pair of planes.
+
+    Parameters
+    ----------
+    planes : list of PlaneInfo or PlaneSet
+        A list containing information for all the planes in the detector
+    planeNo0 : int
+        Index of the first plane
+    boundaries0 : array_like of int
+        Boundary numbers in the first plane, boundary k is the lower edge of primitive wire k
+    planeNo1 : int
+        Index of the second plane
+    boundaries1 : array_like of int
+        Boundary numbers in the second plane, broadcast against boundaries0
+
+    Returns
+    -------
+    np.ndarray of shape (..., 2)
+        Crossing point of every pair of boundaries
+
+    """
+    planes = utilities.asPlaneSet(planes)
+    transform = planes.crossingTransform(planeNo0, planeNo1)
+    boundaries0, boundaries1 = np.broadcast_arrays(np.asarray(boundaries0, dtype=float), np.asarray(boundaries1, dtype=float))
+
+    #written out rather than as a matrix product so results don't depend on the BLAS in use
+    return np.stack((transform[0, 0] * boundaries0 + transform[0, 1] * boundaries1 + transform[0, 2],
+                     transform[1, 0] * boundaries0 + transform[1, 1] * boundaries1 + transform[1, 2]), axis=-1)
+
 def wireIntersection(plane0, wire0, plane1, wire1):
     """Intersection points between two merged wires in different planes
 
@@ -88,16 +125,9 @@ def wireIntersection(plane0, wire0, plane1, wire1):
         Intersection Points Between merged wires
 
     """
-    points = []
-    Lines0 = makeLines(plane0, wire0)
-    Lines1 = makeLines(plane1, wire1)
-
-    points.append(lineIntersection(Lines0[0],Lines1[0]))
-    points.append(lineIntersection(Lines0[1],Lines1[0]))
-    points.append(lineIntersection(Lines0[0],Lines1[1]))
-    points.append(lineIntersection(Lines0[1],Lines1[1]))
+    crossings = wireCrossings([plane0, plane1], 0, (wire0[0], wire0[1] + 1, wire0[0], wire0[1] + 1), 1, (wire1[0], wire1[0], wire1[1] + 1, wire1[1] + 1))
 
-    return points
+    return [Point(x, y) for x, y in crossings.tolist()]
 
 def sortPoints(points):
     """Create convex hull and sort the points of convex hull in counterClockwise order
@@ -121,12 +151,181 @@ def sortPoints(points):
 
     return sortedPoints
 
+def polygonArea(polygon):
+    """Signed area of a polygon, positive if its vertices are in counterClockwise order
+
+    Parameters
+    ----------
+    polygon : np.ndarray of shape (N, 2)
+        Vertices of the polygon in order
+
+    Returns
+    -------
+    float
+        Signed area of the polygon
+
+    """
+    x, y = polygon[:, 0], polygon[:, 1]
+    return 0.5 * (np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+def wirePolygon(planes, planeNo0, wire0, planeNo1, wire1):
+    """Parallelogram where two merged wires from different planes cross
+
+    Parameters
+    ----------
+    planes : PlaneSet
+        Information for all the planes in the detector
+    planeNo0 : int
+        Index of the plane wire0 is in
+    wire0 : tuple[2] of int
+        A merged wire
+    planeNo1 : int
+        Index of the plane wire1 is in
+    wire1 : tuple[2] of int
+        A merged wire
+
+    Returns
+    -------
+    np.ndarray of shape (4, 2)
+        Corners of the parallelogram in counterClockwise order
+
+    """
+    edges0 = (wire0[0], wire0[1] + 1, wire0[1] + 1, wire0[0])
+    edges1 = (wire1[0], wire1[0], wire1[1] + 1, wire1[1] + 1)
+
+    polygon = wireCrossings(planes, planeNo0, edges0, planeNo1, edges1)
+
+    if polygonArea(polygon) < 0:
+        polygon = polygon[::-1]
+
+    return polygon
+
+def projectPolygon(planes, polygon, planeNo):
+    """Position of the vertices of a polygon in wire coordinates of a plane
+
+    Parameters
+    ----------
+    planes : PlaneSet
+        Information for all the planes in the detector
+    polygon : np.ndarray of shape (N, 2)
+        Vertices of the polygon
+    planeNo : int
+        Index of the plane
+
+    Returns
+    -------
+    np.ndarray of shape (N,)
+        Wire coordinate of every vertex, the integer part being the primitive wire number
+
+    """
+    return (polygon[:, 0] * planes.cos[planeNo] + polygon[:, 1] * planes.sin[planeNo] - planes.offsets[planeNo]) / planes.pitch[planeNo]
+
+def clipPolygon(planes, polygon, planeNo, wire):
+    """Clip a convex polygon by the strip covered by a merged wire
+
+    Parameters
+    ----------
+    planes : PlaneSet
+        Information for all the planes in the detector
+    polygon : np.ndarray of shape (N, 2)
+        Vertices of a convex polygon in counterClockwise order
+    planeNo : int
+        Index of the plane the wire is in
+    wire : tuple[2] of int
+        A merged wire
+
+    Returns
+    -------
+    np.ndarray of shape (M, 2)
+        Vertices of the clipped polygon in counterClockwise order, empty if the polygon doesn't overlap the strip
+
+    """
+    wireFloat = projectPolygon(planes, polygon, planeNo)
+
+    polygon, wireFloat = _clipHalfPlane(polygon, wireFloat, wireFloat - wire[0])
+    polygon, wireFloat = _clipHalfPlane(polygon, wireFloat, wire[1] + 1 - wireFloat)
+
+    return polygon
+
+def _clipHalfPlane(polygon, wireFloat, distance):
+    """Keep the part of a convex polygon where distance >= 0 (Sutherland-Hodgman for a single edge)"""
+    side = np.where(distance > clipTolerance, 1, np.where(distance < -clipTolerance, -1, 0))
+
+    if (side >= 0).all():
+        return polygon, wireFloat
+    if (side <= 0).all():
+        return polygon[:0], wireFloat[:0]
+
+    clipped = []
+    for i in range(len(polygon)):
+        j = (i + 1) % len(polygon)
+
+        if side[i] >= 0:
+            clipped.append((polygon[i, 0], polygon[i, 1], wireFloat[i]))
+        #vertices on the boundary are kept as they are, only proper crossings create new vertices
+        if side[i] * side[j] < 0:
+            t = distance[i] / (distance[i] - distance[j])
+            clipped.append((polygon[i, 0] + t * (polygon[j, 0] - polygon[i, 0]),
+                            polygon[i, 1] + t * (polygon[j, 1] - polygon[i, 1]),
+                            wireFloat[i] + t * (wireFloat[j] - wireFloat[i])))
+
+    clipped = np.array(clipped)
+    return clipped[:, :2], clipped[:, 2]
+
+def cellPolygon(planes, wires):
+    """Region covered by merged wires from every plane
+
+    Parameters
+    ----------
+    planes : PlaneSet
+        Information for all the planes in the detector
+    wires : list of tuple[2] of int
+        A list of wires for each plane
+
+    Returns
+    -------
+    np.ndarray of shape (N, 2)
+        Vertices of the region in counterClockwise order, empty if the wires don't overlap
+
+    """
+    polygon = wirePolygon(planes, 0, wires[0], 1, wires[1])
+
+    for planeNo in range(2, len(wires)):
+        polygon = clipPolygon(planes, polygon, planeNo, wires[planeNo])
+
+    return polygon
+
+def cellFromPolygon(planes, wires, polygon):
+    """Make a cell from the region covered by merged wires
+
+    Parameters
+    ----------
+    planes : PlaneSet
+        Information for all the planes in the detector
+    wires : list of tuple[2] of int
+        A list of wires for each plane
+    polygon : np.ndarray of shape (N, 2)
+        Region covered by the wires, as given by cellPolygon
+
+    Returns
+    -------
+    Cell
+        Cell(False, False) if the region has no area else the cell with its wires trimmed to the ones it overlaps
+
+    """
+    cells = cellTableFromPolygons(planes, [(wires, polygon)])
+
+    if len(cells) == 0:
+        return Cell(False, False)
+
+    return Cell(cells[0].wires, [Point(x, y) for x, y in cells.polygon(0).tolist()])
+
 def checkCell(planes, wires):
     """Check if the wires given form a cell
 
     Parameters
     ----------
-    planes : list of PlaneInfo
+    planes : list of PlaneInfo or PlaneSet
         A list containing information for all the planes in the detector
     wires : list of tuple[2] of int
         A list of wires for each plane
@@ -137,66 +336,100 @@ def checkCell(planes, wires):
         Cell(False, False) if it doesn't form a cell else the generated cell
 
     """
-    points = []
-
-    #generate points for interections between wires from every plane
-    for plane0 in range(0,len(wires)):
-        for plane1 in  range(plane0+1,len(wires)):
-            potentialPoints = wireIntersection(planes[plane0], wires[plane0], planes[plane1], wires[plane1])
-
-            #check if point is in cell
-            for point in potentialPoints:
-                isPointInside = True
-                for planeNo, plane in enumerate(planes):
-                    wire = utilities.wireNumberFromPoint(plane, point)
-                    #improves performance by not checking in the planes used to make the point
-                    if planeNo == plane0 or planeNo == plane1:
-                        continue
-                    else:
-                        if not utilities.pointInWire(plane,point,wires[planeNo]):
-                            isPointInside = False
-
-                if isPointInside:
-                    points.append(point)
-
-    #if less than or equal to 2 points or contain the exact same points, cell isn't real
-    if len(points) <=2 or len(set(points)) <=2 :
+    planes = utilities.asPlaneSet(planes)
+
+    if len(wires) < 2:
         return Cell(False, False)
-    else:
-        if len(points)>3:
-            points = sortPoints(points)
-        potentialWires = list(itertools.chain(*geometryGen.mergeEvent(utilities.fireWires(planes,points))))
-        potentialWires = list(map(lambda x: (max((x[0][0],x[1][0])),min((x[0][1],x[1][1]))),zip(wires,potentialWires)))
-        #TODO ask Xin how he handled merging of wires in his code
-        # return Cell(wires,points)
-        return Cell(potentialWires,points)
-
-def reconstructCells(planes,event):
+
+    return cellFromPolygon(planes, wires, cellPolygon(planes, wires))
+
+def reconstructCells(planes,event,recorder=instrumentation.nullRecorder):
     """Reconstruct cells from a merged event
 
     Parameters
     ----------
-    planes : list of PlaneInfo
+    planes : list of PlaneInfo or PlaneSet
         A list containing information for all the planes in the detector
     event : list of list of tuple[2] of int
         List of merged wires in an event
+    recorder : instrumentation.Recorder
+        Counts the combinations of merged wires tried (reconstruct.candidates)
+        and the cells found (reconstruct.cells)
 
     Returns
     -------
-    list of Cell
-        List of cells Reconstructed from Geometric information
+    CellTable
+        Cells Reconstructed from Geometric information
 
     """
-    cells = []
-    #cartesian product of all merged wires
-    potentialCells = list(itertools.product(*event))
-
-    #check if each potential combination is valid
-    for potentialCell in potentialCells:
-        cell = checkCell(planes, potentialCell)
-        if cell[0] == False:
-            continue
-        else:
-            cells.append(cell)
+    planes = utilities.asPlaneSet(planes)
+
+    if len(planes) < 2:
+        return CellTable(np.zeros((0, len(planes), 2), dtype=int), np.zeros((0, 2)), [0])
+
+    #merged wires of the first two planes always cross
+    potentialCells = [((wire0, wire1), wirePolygon(planes, 0, wire0, 1, wire1)) for wire0, wire1 in itertools.product(event[0], event[1])]
+    noOfCandidates = len(potentialCells)
+
+    #only clip with merged wires that overlap the projection of the partial cell onto the next plane
+    for planeNo in range(2, len(planes)):
+        lowerEdges = np.array([wire[0] for wire in event[planeNo]])
+        upperEdges = np.array([wire[1] + 1 for wire in event[planeNo]])
+
+        extendedCells = []
+        for wires, polygon in potentialCells:
+            projection = projectPolygon(planes, polygon, planeNo)
+            overlapping = np.flatnonzero((lowerEdges < projection.max() - clipTolerance) & (upperEdges > projection.min() + clipTolerance))
+            noOfCandidates += len(overlapping)
+
+            for wireNo in overlapping:
+                wire = event[planeNo][wireNo]
+                clipped = clipPolygon(planes, polygon, planeNo, wire)
+                if len(clipped) > 2:
+                    extendedCells.append((wires + (wire,), clipped))
+
+        potentialCells = extendedCells
+
+    cells = cellTableFromPolygons(planes, potentialCells)
+    recorder.count("reconstruct.candidates", noOfCandidates)
+    recorder.count("reconstruct.cells", len(cells))
 
     return cells
+
+def cellTableFromPolygons(planes, potentialCells):
+    """Make cells from the regions covered by merged wires
+
+    Regions without area are dropped, and the wires of every other region are
+    trimmed to the primitive wires it overlaps in each plane.
+
+    Parameters
+    ----------
+    planes : PlaneSet
+        Information for all the planes in the detector
+    potentialCells : list of (list of tuple[2] of int, np.ndarray of shape (N, 2))
+        Wires of every plane and the region they cover, as given by cellPolygon
+
+    Returns
+    -------
+    CellTable
+        Cells of the regions with area, with their wires trimmed to the ones they overlap
+
+    """
+    potentialCells = [(wires, polygon) for wires, polygon in potentialCells if len(polygon) > 2 and polygonArea(polygon) > clipTolerance]
+
+    wires = np.array([wires for wires, polygon in potentialCells], dtype=int).reshape(len(potentialCells), len(planes), 2)
+    offsets = np.concatenate(([0], np.cumsum([len(polygon) for wires, polygon in potentialCells]))).astype(int)
+    if len(potentialCells) == 0:
+        return CellTable(wires, np.zeros((0, 2)), offsets)
+
+    vertices = np.concatenate([polygon for wires, polygon in potentialCells])
+
+    #primitive wires every region actually overlaps in each plane
+    wireFloat = utilities.wireCoordinatesFromPoints(planes, vertices)
+    lowerWires = np.floor(np.minimum.reduceat(wireFloat, offsets[:-1]) + clipTolerance).astype(int)
+    upperWires = np.ceil(np.maximum.reduceat(wireFloat, offsets[:-1]) - clipTolerance).astype(int) - 1
+
+    wires[:, :, 0] = np.maximum(wires[:, :, 0], lowerWires)
+    wires[:, :, 1] = np.minimum(wires[:, :, 1], upperWires)
+
+    return CellTable(wires, vertices, offsets)
@@ -0,0 +1,131 @@
+# External Dependencies
+import contextlib
+import csv
+import json
+import time
+import numpy as np
+
+class Recorder(object):
+    """Records wall time and counters of every stage for every event of a run
+
+    Every event is a flat record of fields named stage.quantity, e.g.
+    reconstruct.time or geometryMatrix.nnz. Records are kept in events in the
+    order events were started.
+    """
+
+    #whether anything is recorded, so work done only for the records can be skipped
+    enabled = True
+
+    def __init__(self):
+        self.events = []
+        self._current = None
+
+    def startEvent(self, **labels):
+        """Start the record of a new event, labels (e.g. eventNo) are stored in it"""
+        self._current = dict(labels)
+        self.events.append(self._current)
+
+    def endEvent(self):
+        """Close the record of the current event, later fields start a new one"""
+        self._current = None
+
+    def merge(self, events):
+        """Add the records of events made elsewhere, e.g. by a Recorder in a worker process"""
+        self.endEvent()
+        self.events.extend(events)
+
+    def _record(self):
+        if self._current is None:
+            self.startEvent()
+        return self._current
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Context manager adding the wall time of its body to name.time of the current event"""
+        record = self._record()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record[name + ".time"] = record.get(name + ".time", 0.0) + time.perf_counter() - start
+
+    def count(self, name, value):
+        """Add value to the counter name of the current event"""
+        record = self._record()
+        record[name] = record.get(name, 0) + value
+
+    def fields(self):
+        """Names of every field recorded, in the order they first appeared"""
+        return list(dict.fromkeys(field for event in self.events for field in event))
+
+    def summary(self):
+        """Number of events, total, mean, min and max of every numeric field over the run
+
+        Returns
+        -------
+        dict
+            Statistics of every field, events without the field are left out
+
+        """
+        summary = {}
+        for field in self.fields():
+            values = np.array([event[field] for event in self.events if field in event and isinstance(event[field], (int, float))], dtype=float)
+            if len(values) == 0:
+                continue
+            summary[field] = {"events": len(values), "total": float(values.sum()), "mean": float(values.mean()),
+                              "min": float(values.min()), "max": float(values.max())}
+        return summary
+
+    def toJSON(self, path):
+        """Write the record of every event and the summary to a JSON file"""
+        with open(path, "w") as outputFile:
+            json.dump({"events": self.events, "summary": self.summary()}, outputFile, indent=2)
+
+    def toCSV(self, path):
+        """Write the record of every event to a CSV file, one row per event"""
+        with open(path, "w", newline="") as outputFile:
+            writer = csv.DictWriter(outputFile, fieldnames=self.fields())
+            writer.writeheader()
+            writer.writerows(self.events)
+
+class NullRecorder(object):
+    """Recorder that records nothing, the default when no instrumentation is asked for"""
+
+    _noStage = contextlib.nullcontext()
+    enabled = False
+
+    def startEvent(self, **labels):
+        pass
+
+    def endEvent(self):
+        pass
+
+    def stage(self, name):
+        return self._noStage
+
+    def count(self, name, value):
+        pass
+
+    def merge(self, events):
+        pass
+
+def recordSolverInfo(recorder, info):
+    """Count the solves, their iterations and the ones that didn't converge
+
+    Parameters
+    ----------
+    recorder : Recorder or NullRecorder
+        Recorder of the current event
+    info : list of SolverInfo
+        Information about every solve of the event, as returned by chargeSolving.solvePath
+
+    """
+    for solveInfo in info:
+        recorder.count("solve.solves", 1)
+        recorder.count("solve.unconverged", int(not solveInfo.converged))
+        #not every solver reports its iterations
+        if solveInfo.iterations is not None:
+            recorder.count("solve.iterations", int(solveInfo.iterations))
+
+#shared recorder for code that isn't given one
+nullRecorder = NullRecorder()
@@ -1,10 +1,12 @@
 # External Dependencies
 import numpy as np
-import itertools
+from scipy import sparse
 
 # Internal Dependencies
 from dataTypes import *
 import utilities
+import geometryGen
+import covariance
 
 def blobInCell(blob, cell):
     """Check if a True Blob is in a cell
@@ -28,14 +30,81 @@ def blobInCell(blob, cell):
     return True
 
 
+class CellIndex(object):
+    """Index of reconstructed cells by the wires that bind them, for finding the cell containing a blob
+
+    The wire ranges of the cells in the first plane are merged into disjoint
+    segments. Every cell lies in exactly one segment, so a blob can only be
+    inside the cells of the segment containing its first plane wires, found by
+    binary search, and containment is only tested against those.
+
+    Parameters
+    ----------
+    cells : list of Cell or CellTable
+        List of cells reconstructed with geometry
+    """
+
+    def __init__(self, cells):
+        self.noOfCells = len(cells)
+        if isinstance(cells, CellTable):
+            self.wires = cells.wires if self.noOfCells else np.zeros((0, 1, 2), dtype=int)
+        else:
+            self.wires = np.array([cell.wires for cell in cells], dtype=int).reshape(self.noOfCells, len(cells[0].wires) if cells else 1, 2)
+
+        self.segments = geometryGen.mergeIntervals(self.wires[:, 0])
+
+        #cells ordered by segment then by cell number, so the first hit in a segment is the first cell
+        cellSegments = np.searchsorted(self.segments[:, 0], self.wires[:, 0, 0], side="right") - 1
+        self.order = np.lexsort((np.arange(self.noOfCells), cellSegments))
+        self.segmentStarts = np.searchsorted(cellSegments[self.order], np.arange(len(self.segments) + 1))
+
+    def find(self, blobWires):
+        """First cell containing every blob, as blobInCell
+
+        Parameters
+        ----------
+        blobWires : array_like of shape (N, nPlanes, 2) of int
+            First and last wire of every blob in every plane
+
+        Returns
+        -------
+        np.ndarray of int
+            Number of the first cell containing every blob, -1 if no cell contains it
+
+        """
+        blobWires = np.asarray(blobWires, dtype=int)
+        cellNos = np.full(len(blobWires), -1)
+        if len(blobWires) == 0 or self.noOfCells == 0:
+            return cellNos
+
+        segmentNos = np.searchsorted(self.segments[:, 0], blobWires[:, 0, 0], side="right") - 1
+        inSegment = (segmentNos >= 0) & (blobWires[:, 0, 1] <= self.segments[np.maximum(segmentNos, 0), 1])
+        segmentNos = np.where(inSegment, segmentNos, 0)
+
+        starts = np.where(inSegment, self.segmentStarts[segmentNos], 0)
+        counts = np.where(inSegment, self.segmentStarts[segmentNos + 1] - starts, 0)
+
+        #every blob paired with every cell of its segment
+        pairBlobs = np.repeat(np.arange(len(blobWires)), counts)
+        pairCells = self.order[np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts - starts, counts)]
+
+        cellWires = self.wires[pairCells]
+        blobPairWires = blobWires[pairBlobs]
+        contained = ((blobPairWires[:, :, 0] >= cellWires[:, :, 0]) & (blobPairWires[:, :, 1] <= cellWires[:, :, 1])).all(axis=1)
+
+        hitBlobs, firstHits = np.unique(pairBlobs[contained], return_index=True)
+        cellNos[hitBlobs] = pairCells[contained][firstHits]
+
+        return cellNos
+
 def generateTrueCellMatrix(blobs, cells):
     """Generate the True charge matrix for cells
 
     Parameters
     ----------
-    blobs : list of Blob
+    blobs : list of Blob or BlobTable
         List of True Blobs
-    cells : list of Cell
+    cells : list of Cell or CellTable
         List of cells reconstructed with geometry
 
     Returns
@@ -44,13 +113,17 @@ def generateTrueCellMatrix(blobs, cells):
         Matrix denoting charge of each cell
 
     """
-    matrix = list(np.zeros((len(cells), 1)))
+    if isinstance(blobs, BlobTable):
+        blobWires, charges = blobs.wires, blobs.charge
+    else:
+        blobWires = [blob.wires for blob in blobs]
+        charges = np.array([blob.charge for blob in blobs], dtype=float)
+
+    cellNos = CellIndex(cells).find(blobWires)
+    found = cellNos >= 0
 
-    for blob in blobs:
-        for cellNo, cell in enumerate(cells):
-            if(blobInCell(blob, cell)):
-                matrix[cellNo][0] += blob.charge
-                break
+    matrix = np.zeros((len(cells), 1))
+    np.add.at(matrix[:, 0], cellNos[found], charges[found])
 
     return np.matrix(matrix)
 
@@ -59,88 +132,233 @@ def constructGeometryMatrix(planes, cells):
 
     Parameters
     ----------
-    planes : list of PlaneInfo
+    planes : list of PlaneInfo or PlaneSet
         A list containing information for all the planes in the detector
-    cells : list of Cell
+    cells : list of Cell or CellTable
         List of cells Reconstructed from Geometric information
 
     Returns
     -------
-    list of tuple[2] int, np.matrix
+    list of tuple[2] int, scipy.sparse.csr_matrix
         list of merged channels, Matrix that associates merged wire with merged cells
 
     """
-    splittingList = []
+    planes = utilities.asPlaneSet(planes)
 
-    # createSplittingList
-    for cellNo, cell in enumerate(cells):
-        for planeNo, wire in enumerate(cell.wires):
-            splittingList.append(utilities.getChannelNo(planes, wire[0], planeNo))
-            splittingList.append(utilities.getChannelNo(planes, wire[1], planeNo)+1)
+    #channel numbers of the first and last wire of every cell in every plane
+    if isinstance(cells, CellTable):
+        cellWires = cells.wires
+    else:
+        cellWires = np.array([cell.wires for cell in cells], dtype=int).reshape(len(cells), len(planes), 2)
+    cellChannels = utilities.getChannelNos(planes, cellWires, np.arange(len(planes))[:, np.newaxis])
 
-    #Sort and make list unique
-    splittingList = list(set(splittingList))
-    splittingList.sort()
+    # createSplittingList, sorted and unique
+    splittingList = np.union1d(cellChannels[..., 0], cellChannels[..., 1] + 1).tolist()
+    splittingIndex = {channel: i for i, channel in enumerate(splittingList)}
 
     channelList = []
-    matrix = []
-
-    for cellNo, cell in enumerate(cells):
-        for planeNo, wire in enumerate(cell.wires):
-            channel0 = utilities.getChannelNo(planes, wire[0], planeNo)
-            channel1 = utilities.getChannelNo(planes, wire[1], planeNo)
-
-            for i in range(splittingList.index(channel0),splittingList.index(channel1+1)):
+    channelIndex = {}
+    rows = []
+    columns = []
+    values = []
+
+    for cellNo, cell in enumerate(cellChannels.tolist()):
+        for channel0, channel1 in cell:
+            for i in range(splittingIndex[channel0],splittingIndex[channel1+1]):
                 mergedChannel = (splittingList[i],splittingList[i+1]-1)
                 fractionalAssociation = (mergedChannel[1]-mergedChannel[0]+1)/(channel1-channel0+1)
 
                 #Check if wire is already in list
-                if mergedChannel not in channelList:
+                if mergedChannel not in channelIndex:
+                    channelIndex[mergedChannel] = len(channelList)
                     channelList.append(mergedChannel)
-                    matrix.append(np.zeros(len(cells)))
 
-                matrix[channelList.index(mergedChannel)][cellNo] = fractionalAssociation
+                rows.append(channelIndex[mergedChannel])
+                columns.append(cellNo)
+                values.append(fractionalAssociation)
+
+    matrix = sparse.coo_matrix((values, (rows, columns)), shape=(len(channelList), len(cells)))
+
+    return channelList, matrix.tocsr()
+
+class ChannelRangeError(IndexError):
+    """Raised when charge is deposited on or measured from channels the detector does not have
+
+    Attributes
+    ----------
+    channels : list of tuple[2] of int
+        First and last channel of every offending range
+    noOfChannels : int
+        Number of channels in the detector
+    """
+
+    def __init__(self, channels, noOfChannels):
+        self.channels = channels
+        self.noOfChannels = noOfChannels
+        super().__init__("channel ranges " + ", ".join(str(channel) for channel in channels) + " outside of the " + str(noOfChannels) + " channels of the detector")
 
-    return channelList, np.matrix(matrix)
+class ChargeStore(object):
+    """Charge deposited on every channel of the detector
+
+    Charge is stored as a difference array over channel numbers, so a blob
+    spreading its charge evenly over a range of wires is two scatter-adds,
+    and measured through prefix sums, so the charge of any merged channel is
+    the difference of two entries.
+
+    Parameters
+    ----------
+    planes : list of PlaneInfo or PlaneSet
+        A list containing information for all the planes in the detector
+    """
+
+    def __init__(self, planes):
+        planes = utilities.asPlaneSet(planes)
+
+        #wires of a plane run from 0 to noOfWires inclusive
+        self.noOfChannels = int(planes.channelOffsets[-1] + planes.noOfWires[-1]) + 1 if len(planes) else 0
+        self._difference = np.zeros(self.noOfChannels + 1)
+        self._prefix = None
+
+    def _checkChannels(self, firstChannels, lastChannels):
+        outside = (firstChannels < 0) | (lastChannels >= self.noOfChannels) | (firstChannels > lastChannels)
+        if outside.any():
+            raise ChannelRangeError(list(zip(firstChannels[outside].tolist(), lastChannels[outside].tolist())), self.noOfChannels)
+
+    def deposit(self, firstChannels, lastChannels, charges):
+        """Spread charges evenly over ranges of channels
+
+        Parameters
+        ----------
+        firstChannels : array_like of int
+            First channel of every range
+        lastChannels : array_like of int
+            Last channel of every range
+        charges : array_like of float
+            Total charge deposited on every range
+        """
+        firstChannels, lastChannels, charges = np.broadcast_arrays(
+            np.asarray(firstChannels, dtype=int), np.asarray(lastChannels, dtype=int), np.asarray(charges, dtype=float))
+        self._checkChannels(firstChannels, lastChannels)
+
+        chargePerChannel = charges / (lastChannels - firstChannels + 1)
+        np.add.at(self._difference, firstChannels.ravel(), chargePerChannel.ravel())
+        np.add.at(self._difference, lastChannels.ravel() + 1, -chargePerChannel.ravel())
+        self._prefix = None
+
+    def depositBlobs(self, planes, blobs):
+        """Spread the charge of every blob evenly over the wires it fires in every plane
+
+        Parameters
+        ----------
+        planes : list of PlaneInfo or PlaneSet
+            A list containing information for all the planes in the detector
+        blobs : list of Blob or BlobTable
+            True blobs in the event
+        """
+        planes = utilities.asPlaneSet(planes)
+        if not isinstance(blobs, BlobTable):
+            blobs = BlobTable.fromBlobs(blobs, len(planes))
+
+        channels = blobs.wires + planes.channelOffsets[:, np.newaxis]
+        self.deposit(channels[:, :, 0], channels[:, :, 1], blobs.charge[:, np.newaxis])
+
+    @property
+    def charges(self):
+        """np.ndarray of the charge on every channel"""
+        return np.cumsum(self._difference[:-1])
+
+    def measure(self, firstChannels, lastChannels):
+        """Total charge on ranges of channels
+
+        Parameters
+        ----------
+        firstChannels : array_like of int
+            First channel of every range
+        lastChannels : array_like of int
+            Last channel of every range
+
+        Returns
+        -------
+        np.ndarray of float
+            Charge on every range
+        """
+        firstChannels, lastChannels = np.broadcast_arrays(np.asarray(firstChannels, dtype=int), np.asarray(lastChannels, dtype=int))
+        self._checkChannels(firstChannels, lastChannels)
+
+        if self._prefix is None:
+            self._prefix = np.concatenate(([0], np.cumsum(self.charges)))
+
+        return self._prefix[lastChannels + 1] - self._prefix[firstChannels]
 
 def constructChargeList(planes,blobs):
-    chargeList = []
+    """Deposit the charge of true blobs on the wires they fire
 
-    for plane in planes:
-        chargeList.append(list(np.zeros(plane.noOfWires,dtype=int)))
+    Parameters
+    ----------
+    planes : list of PlaneInfo or PlaneSet
+        A list containing information for all the planes in the detector
+    blobs : list of Blob or BlobTable
+        True blobs in the event
 
-    for blob in blobs:
-        wires = utilities.fireWires(planes,blob.points)
-        for planeNo, plane in enumerate(wires):
-            charge = blob.charge/(len(plane))
-            for wireNo in plane:
-                chargeList[planeNo][wireNo-1] += charge
+    Returns
+    -------
+    ChargeStore
+        Charge on every channel of the detector
 
-    return chargeList
+    """
+    chargeStore = ChargeStore(planes)
+    chargeStore.depositBlobs(planes, blobs)
+
+    return chargeStore
 
 def measureCharge(wireList,chargeList):
-    charges = []
-    chargeList = list(itertools.chain(*chargeList))
+    """Measure the charge on merged channels
+
+    Parameters
+    ----------
+    wireList : list of tuple[2] of int
+        First and last channel of every merged channel
+    chargeList : ChargeStore
+        Charge on every channel of the detector
+
+    Returns
+    -------
+    np.matrix
+        Charge on every merged channel as a column
 
-    for wire in wireList:
-        charge = 0
-        test = []
-        for i in range(wire[0],wire[1]+1):
-            try:
-                charge += chargeList[i-1]
-            except:
-                print(len(chargeList),i)
+    Raises
+    ------
+    ChannelRangeError
+        If a merged channel is outside of the detector
 
-        charges.append(charge)
+    """
+    wires = np.asarray(wireList, dtype=int).reshape(-1, 2)
+    charges = chargeList.measure(wires[:, 0], wires[:, 1])
 
     return np.reshape(np.matrix(charges),(len(wireList),1))
 
 def addUncertainity(geometryMatrix,wireChargeMatrix,covarianceMatrix):
-    invertedcovarianceMatrix = np.linalg.inv(covarianceMatrix)
-    decomposedMatrix = np.linalg.cholesky(invertedcovarianceMatrix)
+    """Whiten the geometry matrix and the measured charges by the noise covariance of the merged channels
+
+    Parameters
+    ----------
+    geometryMatrix : np.matrix or scipy.sparse matrix
+        Matrix that associates merged wires with merged cells
+    wireChargeMatrix : np.matrix
+        Charge measured on every merged wire
+    covarianceMatrix : covariance.Covariance or array_like of float
+        Noise covariance of the merged wires
+
+    Returns
+    -------
+    np.matrix or scipy.sparse matrix, np.matrix
+        Whitened geometry matrix, sparse if geometryMatrix is sparse, and whitened charges
+
+    """
+    covarianceMatrix = covariance.asCovariance(covarianceMatrix)
 
     #Adding Uncertaininty through Covariance Matrix
-    wireChargeMatrixU = decomposedMatrix * wireChargeMatrix
-    geometryMatrixU = decomposedMatrix * geometryMatrix
+    wireChargeMatrixU = covarianceMatrix.whiten(wireChargeMatrix)
+    geometryMatrixU = covarianceMatrix.whiten(geometryMatrix)
 
     return geometryMatrixU, wireChargeMatrixU
@@ -0,0 +1,292 @@
+# Internal Dependencies
+from dataTypes import *
+import utilities
+import geometryGen
+import geometryReco
+import matrixGeneration
+import chargeSolving
+import covariance
+import scoring
+import instrumentation
+
+#fields every event keeps to the end of the pipeline, whatever is asked for
+metricFields = ("eventNo", "noOfBlobs", "noOfCells", "alphas", "correctIDs", "fakeIDs", "missedIDs", "chargeResiduals", "correctFractions", "fakeFractions")
+
+def generateEvent(planes, volume, noOfBlobs, rng=None, eventNo=None, recorder=instrumentation.nullRecorder):
+    """Generate the true blobs of a single event, the start of every chain of stages
+
+    Parameters
+    ----------
+    planes : PlaneSet
+        Information for all the planes in the detector
+    volume : DetectorVolume
+        The width and height of the detector
+    noOfBlobs : int
+        Number of true blobs in the event
+    rng : np.random.Generator
+        Random number generator of the event, the global numpy random state (np.random) if None
+    eventNo : int
+        Number of the event
+    recorder : instrumentation.Recorder
+        Records every stage of the event, a new record is started for it
+
+    Returns
+    -------
+    dict
+        Event with eventNo, planes and blobs
+
+    """
+    recorder.startEvent(eventNo=eventNo)
+    with recorder.stage("generate"):
+        blobs = geometryGen.generateBlobTable(planes, volume, noOfBlobs, rng)
+
+    return {"eventNo": eventNo, "planes": planes, "blobs": blobs}
+
+def generateEvents(volume, wirePitches, angles, noOfBlobs, eventNos, seed, streamKey=(), recorder=instrumentation.nullRecorder):
+    """Generate the true blobs of events one at a time
+
+    Parameters
+    ----------
+    volume : DetectorVolume
+        The width and height of the detector
+    wirePitches : list of float
+        Wire pitch of every plane
+    angles : list of float
+        Angle of every plane in radians
+    noOfBlobs : int
+        Number of true blobs in every event
+    eventNos : iterable of int
+        Numbers of the events to generate
+    seed : int or np.random.SeedSequence
+        Seed of the run
+    streamKey : tuple of int
+        Prefix of the event index, event i is generated from utilities.eventRng(seed, *streamKey, i)
+    recorder : instrumentation.Recorder
+        Records every stage of every event, a new record is started for every event
+
+    Yields
+    ------
+    dict
+        Event with eventNo, planes and blobs
+
+    """
+    planes = utilities.getPlaneSet(wirePitches, volume, angles)
+
+    for eventNo in eventNos:
+        yield generateEvent(planes, volume, noOfBlobs, utilities.eventRng(seed, *(tuple(streamKey) + (eventNo,))), eventNo, recorder)
+
+def mergeEvents(events, recorder=instrumentation.nullRecorder):
+    """Add the merged wires fired by the blobs of every event
+
+    Parameters
+    ----------
+    events : iterable of dict
+        Events with planes and blobs
+    recorder : instrumentation.Recorder
+        Records the stage in the record of the current event
+
+    Yields
+    ------
+    dict
+        Event with event, the merged wires of every plane, added
+
+    """
+    for event in events:
+        with recorder.stage("merge"):
+            event["event"] = geometryGen.mergeIntervalEvent(geometryGen.generateIntervalEvent(event["planes"], event["blobs"]))
+        yield event
+
+def reconstructEvents(events, recorder=instrumentation.nullRecorder):
+    """Add the cells reconstructed from the merged wires of every event
+
+    Parameters
+    ----------
+    events : iterable of dict
+        Events with planes and event
+    recorder : instrumentation.Recorder
+        Records the stage and the candidate and accepted cells in the record of the current event
+
+    Yields
+    ------
+    dict
+        Event with cells added
+
+    """
+    for event in events:
+        with recorder.stage("reconstruct"):
+            event["cells"] = geometryReco.reconstructCells(event["planes"], event["event"], recorder)
+        yield event
+
+def buildMatrices(events, noise=None, recorder=instrumentation.nullRecorder):
+    """Add the geometry matrix, the measured and true charges and their whitened forms to every event
+
+    Parameters
+    ----------
+    events : iterable of dict
+        Events with planes, blobs and cells
+    noise : callable
+        Noise covariance of the merged wires of an event from its channelList, e.g. a covariance.ChannelNoise.
+        Unit noise if None
+    recorder : instrumentation.Recorder
+        Records every stage and the shape of the geometry matrix in the record of the current event
+
+    Yields
+    ------
+    dict
+        Event with channelList, geometryMatrix, recoWireMatrix, geometryMatrixU, recoWireMatrixU and trueCellMatrix added
+
+    """
+    for event in events:
+        planes, blobs, cells = event["planes"], event["blobs"], event["cells"]
+
+        with recorder.stage("geometryMatrix"):
+            channelList, geometryMatrix = matrixGeneration.constructGeometryMatrix(planes, cells)
+        recorder.count("geometryMatrix.rows", geometryMatrix.shape[0])
+        recorder.count("geometryMatrix.columns", geometryMatrix.shape[1])
+        recorder.count("geometryMatrix.nnz", geometryMatrix.nnz)
+
+        with recorder.stage("measure"):
+            recoWireMatrix = matrixGeneration.measureCharge(channelList, matrixGeneration.constructChargeList(planes, blobs))
+
+        with recorder.stage("whiten"):
+            noiseCovariance = covariance.noiseCovariance(noise, channelList)
+            event["geometryMatrixU"], event["recoWireMatrixU"] = matrixGeneration.addUncertainity(geometryMatrix, recoWireMatrix, noiseCovariance)
+
+        with recorder.stage("truth"):
+            event["trueCellMatrix"] = matrixGeneration.generateTrueCellMatrix(blobs, cells)
+
+        event["channelList"] = channelList
+        event["geometryMatrix"] = geometryMatrix
+        event["recoWireMatrix"] = recoWireMatrix
+        yield event
+
+def solveEvents(events, alphas, solver="lasso", recorder=instrumentation.nullRecorder):
+    """Add the charge of every cell solved for every regularization strength
+
+    Parameters
+    ----------
+    events : iterable of dict
+        Events with geometryMatrixU and recoWireMatrixU
+    alphas : list of float
+        Regularization strengths, solved as a warm started path
+    solver : str
+        Name of the solver in chargeSolving.solvers to use
+    recorder : instrumentation.Recorder
+        Records the stage and the iterations of the solver in the record of the current event
+
+    Yields
+    ------
+    dict
+        Event with alphas and recoCellMatrices, one per alpha, added
+
+    """
+    for event in events:
+        event["alphas"] = list(alphas)
+        with recorder.stage("solve"):
+            event["recoCellMatrices"], info = chargeSolving.solvePath(event["recoWireMatrixU"], event["geometryMatrixU"], alphas, solver, returnInfo=True)
+        instrumentation.recordSolverInfo(recorder, info)
+        yield event
+
+def scoreEvents(events, recorder=instrumentation.nullRecorder):
+    """Add how well every regularization strength identified the true cells
+
+    Parameters
+    ----------
+    events : iterable of dict
+        Events with blobs, cells, recoCellMatrices and trueCellMatrix
+    recorder : instrumentation.Recorder
+        Records the stage and closes the record of the event
+
+    Yields
+    ------
+    dict
+        Event with noOfBlobs, noOfCells and, one per alpha, correctIDs, fakeIDs, missedIDs,
+        chargeResiduals, correctFractions and fakeFractions added
+
+    """
+    for event in events:
+        recoCellMatrices = event["recoCellMatrices"]
+        with recorder.stage("score"):
+            score = scoring.scoreEvents(recoCellMatrices, [event["trueCellMatrix"]] * len(recoCellMatrices), len(event["blobs"]))
+        recorder.endEvent()
+
+        event["noOfBlobs"] = len(event["blobs"])
+        event["noOfCells"] = len(event["cells"])
+        event["correctIDs"] = score.correctID.tolist()
+        event["fakeIDs"] = score.fakeID.tolist()
+        event["missedIDs"] = score.missedID.tolist()
+        event["chargeResiduals"] = score.chargeResidual.tolist()
+        event["correctFractions"] = score.correctFraction.tolist()
+        event["fakeFractions"] = score.fakeFraction.tolist()
+        yield event
+
+def keepFields(events, keep=()):
+    """Drop everything but the metrics and the chosen artifacts from every event
+
+    Parameters
+    ----------
+    events : iterable of dict
+        Events from any stage
+    keep : iterable of str
+        Fields to keep on top of metricFields, e.g. ("blobs", "cells")
+
+    Yields
+    ------
+    dict
+        Event with only the fields asked for
+
+    """
+    fields = set(metricFields).union(keep)
+
+    for event in events:
+        yield {field: value for field, value in event.items() if field in fields}
+
+def run(volume, wirePitches, angles, noOfBlobs, alphas, eventNos, seed, solver="lasso", keep=(), streamKey=(), noise=None, recorder=instrumentation.nullRecorder):
+    """Generate, reconstruct, solve and score events lazily, one at a time
+
+    Only the metrics and the artifacts in keep outlive an event, so a scan
+    over any number of events runs in constant memory. Every stage is a
+    generator over events and can be composed on its own.
+
+    Parameters
+    ----------
+    volume : DetectorVolume
+        The width and height of the detector
+    wirePitches : list of float
+        Wire pitch of every plane
+    angles : list of float
+        Angle of every plane in radians
+    noOfBlobs : int
+        Number of true blobs in every event
+    alphas : list of float
+        Regularization strengths
+    eventNos : iterable of int
+        Numbers of the events to run
+    seed : int or np.random.SeedSequence
+        Seed of the run, see generateEvents
+    solver : str
+        Name of the solver in chargeSolving.solvers to use
+    keep : iterable of str
+        Artifacts to keep, any of planes, blobs, event, cells, channelList, geometryMatrix, recoWireMatrix,
+        geometryMatrixU, recoWireMatrixU, trueCellMatrix and recoCellMatrices
+    streamKey : tuple of int
+        Prefix of the event index, see generateEvents
+    noise : callable
+        Noise covariance of the merged wires of an event from its channelList, see buildMatrices
+    recorder : instrumentation.Recorder
+        Records wall time and counters of every stage of every event
+
+    Yields
+    ------
+    dict
+        Metrics of every event, see metricFields, and the artifacts kept
+
+    """
+    events = generateEvents(volume, wirePitches, angles, noOfBlobs, eventNos, seed, streamKey, recorder)
+    events = mergeEvents(events, recorder)
+    events = reconstructEvents(events, recorder)
+    events = buildMatrices(events, noise, recorder)
+    events = solveEvents(events, alphas, solver, recorder)
+    events = scoreEvents(events, recorder)
+
+    return keepFields(events, keep)
@@ -1,4 +1,5 @@
 # External Dependencies
+import os
 import sys
 import math
 import numpy as np
@@ -8,12 +9,18 @@ import ROOT as root
 from dataTypes import *
 import driver
 import efficiencyPurityPlot
+import instrumentation
 import draw
 
 def main(argv):
     #saveOptions
     directory = "img"
     fileName = "pitch3ComplN"
+    #partial sums of every configuration, a rerun resumes from them
+    checkpointDirectory = "checkpoints"
+    #per-stage timings and counters of every event of every configuration, not recorded if None.
+    #records are held in memory until the scan ends, a few KB per event
+    stagesDirectory = None
 
 ########################################################
 
@@ -25,6 +32,7 @@ def main(argv):
     alphas = np.linspace(0.001, 1, 20)
 
     numberOfIterations = 100000
+    seed = 0
 
     c1 = root.TCanvas("PuriyEfficiencyCanvas",
                       "PuriyEfficiencyCanvas", 200, 10, 700, 500)
@@ -37,8 +45,17 @@ def main(argv):
 
     mg = root.TMultiGraph()
 
+    os.makedirs(checkpointDirectory, exist_ok=True)
+    recordStages = isinstance(stagesDirectory, str) and len(stagesDirectory) > 0
+    if recordStages:
+        os.makedirs(stagesDirectory, exist_ok=True)
+
     for i, wirePitches in enumerate(wirePitchList):
-        g = efficiencyPurityPlot.efficiencyPurityGraph(volume, wirePitches, anglesList[i], numberOfBlobs, alphas, numberOfIterations)
+        recorder = instrumentation.Recorder() if recordStages else instrumentation.nullRecorder
+        g = efficiencyPurityPlot.efficiencyPurityGraph(volume, wirePitches, anglesList[i], numberOfBlobs, alphas, numberOfIterations, warmStart=True, workers=None, seed=seed,
+                                                       checkpoint=os.path.join(checkpointDirectory, fileName + "_" + str(i) + ".json"), recorder=recorder)
+        if recordStages:
+            recorder.toJSON(os.path.join(stagesDirectory, fileName + "_" + str(i) + ".json"))
         legend.AddEntry(g,"Pitch: " + str(wirePitches[0]),"l")
         g.SetLineColor(colors[i])
         mg.Add(g)
@@ -25,6 +25,7 @@ def main(argv):
     alphas = np.linspace(0.001, 1, 10)
 
     numberOfIterations = 10000
+    seed = 0
 
     c1 = root.TCanvas("PuriyEfficiencyCanvas",
                       "PuriyEfficiencyCanvas", 200, 10, 700, 500)
@@ -38,7 +39,7 @@ def main(argv):
     mg = root.TMultiGraph()
 
     for i, wirePitches in enumerate(wirePitchList):
-        g = efficiencyPurityPlot.efficiencyPurityGraph(volume, wirePitches, anglesList[i], numberOfBlobs, alphas, numberOfIterations)
+        g = efficiencyPurityPlot.efficiencyPurityGraph(volume, wirePitches, anglesList[i], numberOfBlobs, alphas, numberOfIterations, warmStart=True, workers=None, seed=seed)
         legend.AddEntry(g,"Planes: " + str(len(wirePitches)),"l")
         g.SetLineColor(colors[i])
         mg.Add(g)
@@ -0,0 +1,168 @@
+# External Dependencies
+import os
+import sys
+import argparse
+import numpy as np
+
+# Internal Dependencies
+from dataTypes import *
+import matrixGeneration
+import chargeSolving
+import covariance
+import pipeline
+import eventStore
+import eventFarm
+import instrumentation
+
+def loadEvents(store, indices=None, noise=None, recorder=instrumentation.nullRecorder):
+    """Read stored events and whiten their matrices, ready to be solved
+
+    Parameters
+    ----------
+    store : str or eventStore.EventStore
+        Event store or its directory
+    indices : iterable of int
+        Indices of the events in the store, all of them if None
+    noise : callable
+        Noise covariance of the merged wires of an event from its channelList, see pipeline.buildMatrices
+    recorder : instrumentation.Recorder
+        Records reading and whitening every event, a new record is started for every event
+
+    Yields
+    ------
+    dict
+        Stored event, see eventStore.EventStore, with geometryMatrixU and recoWireMatrixU added
+
+    """
+    if not isinstance(store, eventStore.EventStore):
+        store = eventStore.EventStore(store)
+    if indices is None:
+        indices = range(len(store))
+
+    for index in indices:
+        recorder.startEvent(index=index)
+        with recorder.stage("load"):
+            event = store[index]
+
+        with recorder.stage("whiten"):
+            noiseCovariance = covariance.noiseCovariance(noise, event["channelList"])
+            event["geometryMatrixU"], event["recoWireMatrixU"] = matrixGeneration.addUncertainity(event["geometryMatrix"], event["recoWireMatrix"], noiseCovariance)
+        yield event
+
+def run(store, alphas, solver="lasso", indices=None, keep=(), noise=None, recorder=instrumentation.nullRecorder):
+    """Solve and score stored events lazily, one at a time, without regenerating them
+
+    Parameters
+    ----------
+    store : str or eventStore.EventStore
+        Event store or its directory
+    alphas : list of float
+        Regularization strengths
+    solver : str
+        Name of the solver in chargeSolving.solvers to use
+    indices : iterable of int
+        Indices of the events in the store, all of them if None
+    keep : iterable of str
+        Artifacts to keep on top of pipeline.metricFields, see pipeline.run
+    noise : callable
+        Noise covariance of the merged wires of an event from its channelList, see pipeline.buildMatrices
+    recorder : instrumentation.Recorder
+        Records wall time and counters of every stage of every event
+
+    Yields
+    ------
+    dict
+        Metrics of every event, see pipeline.metricFields, and the artifacts kept
+
+    """
+    events = loadEvents(store, indices, noise, recorder)
+    events = pipeline.solveEvents(events, alphas, solver, recorder)
+    events = pipeline.scoreEvents(events, recorder)
+
+    return pipeline.keepFields(events, keep)
+
+def replayChunk(task):
+    """Solve and score a contiguous range of stored events
+
+    Parameters
+    ----------
+    task : tuple
+        (path, alphas, solver, start, stop, noise)
+
+    Returns
+    -------
+    np.ndarray, np.ndarray, int
+        Sum of correct fractions and of fake fractions for every alpha, number of events processed
+
+    """
+    path, alphas, solver, start, stop, noise = task
+
+    correctSums, fakeSums = eventFarm.sumFractions(run(path, alphas, solver, range(start, stop), noise=noise), len(alphas))
+
+    return correctSums, fakeSums, stop - start
+
+def scanEfficiencyPurity(path, alphas, solver="lasso", workers=None, chunkSize=100, noise=None):
+    """Sum correct and fake identification fractions over every stored event, spread over a process pool
+
+    Every worker memory maps the store on its own, so only the events of its
+    chunks are read. Sums are added up in chunk order and don't depend on the
+    number of workers.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the event store
+    alphas : list of float
+        Regularization strengths, every event is solved for all of them
+    solver : str
+        Name of the solver in chargeSolving.solvers to use
+    workers : int
+        Number of processes, all cores if None and in this process if 1
+    chunkSize : int
+        Number of events in a work unit
+    noise : callable
+        Noise covariance of the merged wires of an event from its channelList, see pipeline.buildMatrices.
+        It is sent to the worker processes, so it must be picklable, e.g. a covariance.ChannelNoise
+
+    Returns
+    -------
+    list of float, list of float, int
+        Sum of correct fractions and of fake fractions for every alpha, number of events
+
+    """
+    if workers is None:
+        workers = os.cpu_count()
+
+    noOfEvents = len(eventStore.EventStore(path))
+    chunks = [(path, list(alphas), solver, start, min(start + chunkSize, noOfEvents), noise) for start in range(0, noOfEvents, chunkSize)]
+
+    correctSums = np.zeros(len(alphas))
+    fakeSums = np.zeros(len(alphas))
+
+    for chunkCorrect, chunkFake, chunkEvents in eventFarm.mapChunks(replayChunk, chunks, workers):
+        correctSums += chunkCorrect
+        fakeSums += chunkFake
+
+    return correctSums.tolist(), fakeSums.tolist(), noOfEvents
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Solve and score the events of an event store for many regularization strengths")
+    parser.add_argument("store", help="directory written by eventStore.writeEvents")
+    parser.add_argument("--alphas", type=float, nargs="+", default=np.linspace(0.001, 1, 20).tolist())
+    parser.add_argument("--solver", default="lasso", choices=sorted(chargeSolving.solvers))
+    parser.add_argument("--workers", type=int, default=None, help="processes to use, all cores by default")
+    parser.add_argument("--chunk-size", type=int, default=100, help="events in a work unit")
+    parser.add_argument("--channel-variances", help=".npy file of the noise variance of every channel, unit noise by default")
+    args = parser.parse_args(argv[1:])
+
+    noise = covariance.ChannelNoise(np.load(args.channel_variances)) if args.channel_variances else None
+    correctSums, fakeSums, noOfEvents = scanEfficiencyPurity(args.store, args.alphas, args.solver, args.workers, args.chunk_size, noise)
+
+    print("{:>12}{:>12}{:>12}".format("alpha", "efficiency", "purity"))
+    for alpha, correctSum, fakeSum in zip(args.alphas, correctSums, fakeSums):
+        print("{:>12.4g}{:>12.4f}{:>12.4f}".format(alpha, correctSum / max(noOfEvents, 1), 1 - fakeSum / max(noOfEvents, 1)))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
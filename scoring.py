@@ -0,0 +1,119 @@
+# External Dependencies
+import numpy as np
+
+# Internal Dependencies
+from dataTypes import *
+
+def cellFlags(cellMatrix):
+    """Which cells have charge
+
+    Parameters
+    ----------
+    cellMatrix : np.matrix or array_like of float
+        Charge of every cell
+
+    Returns
+    -------
+    np.ndarray of Boolean
+        True for every cell with non-zero charge
+
+    """
+    return np.asarray(cellMatrix, dtype=float).ravel() != 0
+
+def chargeResiduals(recoCellMatrix, trueCellMatrix):
+    """Solved minus true charge of every cell
+
+    Parameters
+    ----------
+    recoCellMatrix : np.matrix or array_like of float
+        Solved charge of every cell
+    trueCellMatrix : np.matrix or array_like of float
+        True charge of every cell
+
+    Returns
+    -------
+    np.ndarray of float
+        Charge residual of every cell
+
+    """
+    return np.asarray(recoCellMatrix, dtype=float).ravel() - np.asarray(trueCellMatrix, dtype=float).ravel()
+
+def countIdentifications(recoCellMatrix, trueCellMatrix):
+    """Count correctly, falsely and not identified cells
+
+    Parameters
+    ----------
+    recoCellMatrix : np.matrix or array_like of float
+        Solved charge of every cell
+    trueCellMatrix : np.matrix or array_like of float
+        True charge of every cell
+
+    Returns
+    -------
+    int, int, int
+        Number of correct, fake and missed cells
+
+    """
+    recoCells = cellFlags(recoCellMatrix)
+    trueCells = cellFlags(trueCellMatrix)
+
+    return int(np.count_nonzero(trueCells & recoCells)), int(np.count_nonzero(~trueCells & recoCells)), int(np.count_nonzero(trueCells & ~recoCells))
+
+def scoreEvent(recoCellMatrix, trueCellMatrix, noOfBlobs):
+    """Score the charge solve of one event
+
+    Parameters
+    ----------
+    recoCellMatrix : np.matrix or array_like of float
+        Solved charge of every cell
+    trueCellMatrix : np.matrix or array_like of float
+        True charge of every cell
+    noOfBlobs : int
+        Number of true blobs in the event
+
+    Returns
+    -------
+    Score
+        Identification counts, charge residual and fractions of the event
+
+    """
+    correctID, fakeID, missedID = countIdentifications(recoCellMatrix, trueCellMatrix)
+    chargeResidual = float(np.abs(chargeResiduals(recoCellMatrix, trueCellMatrix)).sum())
+
+    return Score(correctID, fakeID, missedID, chargeResidual, correctID / noOfBlobs, fakeID / noOfBlobs)
+
+def scoreEvents(recoCellMatrices, trueCellMatrices, noOfBlobs):
+    """Score the charge solves of many events at once
+
+    Parameters
+    ----------
+    recoCellMatrices : list of np.matrix or array_like of float
+        Solved charge of every cell of every event
+    trueCellMatrices : list of np.matrix or array_like of float
+        True charge of every cell of every event
+    noOfBlobs : int or array_like of int
+        Number of true blobs in every event
+
+    Returns
+    -------
+    Score
+        Identification counts, charge residuals and fractions, each an np.ndarray over events
+
+    """
+    noOfCells = [np.size(trueCellMatrix) for trueCellMatrix in trueCellMatrices]
+    eventNos = np.repeat(np.arange(len(noOfCells)), noOfCells)
+
+    recoCells = np.concatenate([cellFlags(recoCellMatrix) for recoCellMatrix in recoCellMatrices] + [np.zeros(0, dtype=bool)])
+    trueCells = np.concatenate([cellFlags(trueCellMatrix) for trueCellMatrix in trueCellMatrices] + [np.zeros(0, dtype=bool)])
+    residuals = np.concatenate([chargeResiduals(reco, true) for reco, true in zip(recoCellMatrices, trueCellMatrices)] + [np.zeros(0)])
+
+    #per event sums of per cell flags
+    def perEvent(values):
+        return np.bincount(eventNos, weights=values, minlength=len(noOfCells))
+
+    correctID = perEvent(trueCells & recoCells).astype(int)
+    fakeID = perEvent(~trueCells & recoCells).astype(int)
+    missedID = perEvent(trueCells & ~recoCells).astype(int)
+    noOfBlobs = np.broadcast_to(np.asarray(noOfBlobs, dtype=float), correctID.shape)
+
+    return Score(correctID, fakeID, missedID, perEvent(np.abs(residuals)), correctID / noOfBlobs, fakeID / noOfBlobs)
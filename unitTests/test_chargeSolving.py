@@ -0,0 +1,62 @@
+#add parent directory to import path
+import os.path, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+#External Dependencies
+import numpy as np
+import pytest
+from scipy import sparse
+
+#Internal Dependencies
+import chargeSolving
+from dataTypes import *
+
+
+def test_solve():
+    geometryMatrix = sparse.csr_matrix([[1.0, 0.0, 0.5], [0.0, 1.0, 0.5], [1.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    trueCellMatrix = np.matrix([[4.0], [0.0], [2.0]])
+    wireMatrix = geometryMatrix * trueCellMatrix
+
+    lasso = chargeSolving.solve(wireMatrix, geometryMatrix, 0.01, "lasso")
+    cd, info = chargeSolving.solve(wireMatrix, geometryMatrix, 0.01, "cd", returnInfo=True)
+    nnls = chargeSolving.solve(wireMatrix, geometryMatrix, 0.01, "nnls")
+
+    assert cd.shape == (3, 1)
+    assert info.solver == "cd" and info.converged
+    assert np.allclose(cd, lasso, atol=1e-3)
+    assert np.allclose(nnls, trueCellMatrix)
+
+def test_solveUnknownSolver():
+    with pytest.raises(ValueError):
+        chargeSolving.solve(np.matrix([[1.0]]), np.matrix([[1.0]]), 0.1, "unknown")
+
+def test_solvePath():
+    geometryMatrix = sparse.csr_matrix([[1.0, 0.0, 0.5], [0.0, 1.0, 0.5], [1.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    wireMatrix = geometryMatrix * np.matrix([[4.0], [0.0], [2.0]])
+    alphas = [0.01, 0.5, 0.1]
+
+    for solver in chargeSolving.solvers:
+        solved, info = chargeSolving.solvePath(wireMatrix, geometryMatrix, alphas, solver, returnInfo=True)
+
+        assert len(solved) == len(info) == len(alphas)
+        for alpha, path in zip(alphas, solved):
+            assert np.allclose(path, chargeSolving.solve(wireMatrix, geometryMatrix, alpha, solver), atol=1e-3)
+
+def test_solveSparse():
+    #large enough for the Gram matrix to stay sparse, which holds the centring as a rank one correction
+    rng = np.random.default_rng(4)
+    noOfWires, noOfCells = 1500, 1000
+    rows = rng.integers(0, noOfWires, size=(noOfCells, 3))
+    geometryMatrix = sparse.csr_matrix((rng.uniform(0.2, 1.0, rows.size), (rows.ravel(), np.repeat(np.arange(noOfCells), 3))), shape=(noOfWires, noOfCells))
+    trueCharges = np.zeros(noOfCells)
+    trueCharges[rng.choice(noOfCells, 20, replace=False)] = rng.uniform(50, 100, 20)
+    wireMatrix = np.matrix(geometryMatrix @ trueCharges).T
+
+    gram, correlation, centring = chargeSolving.centredGram(sparse.csc_matrix(geometryMatrix), np.asarray(wireMatrix).ravel())
+    assert sparse.issparse(gram)
+
+    cd, info = chargeSolving.solve(wireMatrix, geometryMatrix, 0.01, "cd", returnInfo=True)
+    lasso = chargeSolving.solve(wireMatrix, geometryMatrix, 0.01, "lasso")
+
+    assert info.converged
+    assert np.allclose(cd, lasso, atol=1e-4)
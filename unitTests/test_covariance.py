@@ -0,0 +1,65 @@
+#add parent directory to import path
+import os.path, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+#External Dependencies
+import numpy as np
+import pytest
+from scipy import sparse
+
+#Internal Dependencies
+import covariance
+
+
+def test_whiten():
+    blocks = [np.array([[2.0, 0.5], [0.5, 1.0]]), np.array([[4.0]])]
+    rows = [[3, 0], [2]]
+
+    covarianceMatrix = np.identity(5)
+    for groupRows, block in zip(rows, blocks):
+        covarianceMatrix[np.ix_(groupRows, groupRows)] = block
+
+    forms = [
+        covariance.BlockDiagonalCovariance(5, rows, blocks),
+        covariance.DenseCovariance(covarianceMatrix),
+        covariance.asCovariance(covarianceMatrix),
+    ]
+
+    for form in forms:
+        for matrix in (np.identity(5), sparse.identity(5, format="csr")):
+            whitening = form.whiten(matrix)
+            assert sparse.issparse(whitening) == sparse.issparse(matrix)
+
+            whitening = whitening.toarray() if sparse.issparse(whitening) else np.asarray(whitening)
+            assert whitening.T @ whitening == pytest.approx(np.linalg.inv(covarianceMatrix))
+
+def test_asCovariance():
+    assert isinstance(covariance.asCovariance(np.identity(3)), covariance.IdentityCovariance)
+
+    diagonal = covariance.asCovariance(np.diag([1.0, 4.0, 9.0]))
+    assert isinstance(diagonal, covariance.DiagonalCovariance)
+    assert np.asarray(diagonal.whiten(np.ones((3, 1)))).ravel().tolist() == pytest.approx([1.0, 0.5, 1 / 3])
+
+def test_invalidCovariance():
+    with pytest.raises(ValueError):
+        covariance.asCovariance(np.diag([1.0, 0.0, 2.0]))
+    with pytest.raises(ValueError):
+        covariance.DiagonalCovariance([1.0, -1.0])
+    with pytest.raises(ValueError):
+        covariance.DenseCovariance([[1.0, 2.0], [2.0, 1.0]])
+    with pytest.raises(ValueError):
+        covariance.BlockDiagonalCovariance(3, [[0, 1]], [[[1.0, 1.0], [1.0, 1.0]]])
+    with pytest.raises(TypeError):
+        covariance.Covariance()
+
+def test_channelNoise():
+    noise = covariance.ChannelNoise([1.0, 2.0, 3.0, 4.0, 5.0])
+
+    #a merged channel has the summed variance of its channels
+    assert noise([(0, 0), (1, 3), (4, 4)]).variances.tolist() == [1.0, 9.0, 5.0]
+    assert noise([(2, 4)]).size == 1
+
+    with pytest.raises(ValueError):
+        noise([(3, 5)])
+    with pytest.raises(ValueError):
+        covariance.ChannelNoise([1.0, 0.0])
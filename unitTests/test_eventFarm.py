@@ -0,0 +1,100 @@
+#add parent directory to import path
+import os.path, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+#External Dependencies
+import time
+import pytest
+
+#Internal Dependencies
+import eventFarm
+import instrumentation
+import driver
+from dataTypes import *
+
+
+def slowChunk(seconds):
+    time.sleep(seconds)
+    return seconds
+
+def test_scanEfficiencyPurity():
+    volume = DetectorVolume(1000.0, 1000.0)
+    wirePitches = [5.0, 5.0, 5.0]
+    angles = driver.generateAngles(len(wirePitches))
+    alphas = [0.01, 0.1]
+
+    for warmStart in (True, False):
+        serial = eventFarm.scanEfficiencyPurity(volume, wirePitches, angles, 3, alphas, 6, workers=1, chunkSize=2, seed=7, warmStart=warmStart, solver="cd")
+        parallel = eventFarm.scanEfficiencyPurity(volume, wirePitches, angles, 3, alphas, 6, workers=3, chunkSize=2, seed=7, warmStart=warmStart, solver="cd")
+
+        assert serial == parallel
+
+def test_checkpoint(tmp_path, monkeypatch):
+    volume = DetectorVolume(1000.0, 1000.0)
+    wirePitches = [5.0, 5.0, 5.0]
+    angles = driver.generateAngles(len(wirePitches))
+    alphas = [0.01, 0.1]
+    checkpoint = str(tmp_path / "scan.json")
+
+    uninterrupted = eventFarm.scanEfficiencyPurity(volume, wirePitches, angles, 3, alphas, 6, workers=1, chunkSize=2, seed=7, warmStart=False, solver="cd")
+
+    #stop the scan after two chunks
+    runChunk = eventFarm.runChunk
+    calls = []
+    def interruptedChunk(task):
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        calls.append(task)
+        return runChunk(task)
+
+    monkeypatch.setattr(eventFarm, "runChunk", interruptedChunk)
+    with pytest.raises(KeyboardInterrupt):
+        eventFarm.scanEfficiencyPurity(volume, wirePitches, angles, 3, alphas, 6, workers=1, chunkSize=2, seed=7, warmStart=False, solver="cd",
+                                       checkpoint=checkpoint, checkpointInterval=0)
+
+    assert eventFarm.loadCheckpoint(checkpoint)["completedChunks"] == 2
+
+    #resuming only runs the remaining chunks and gives the same sums
+    calls.clear()
+    monkeypatch.setattr(eventFarm, "runChunk", lambda task: calls.append(task) or runChunk(task))
+    resumed = eventFarm.scanEfficiencyPurity(volume, wirePitches, angles, 3, alphas, 6, workers=1, chunkSize=2, seed=None, warmStart=False, solver="cd",
+                                             checkpoint=checkpoint, checkpointInterval=0)
+
+    assert resumed == uninterrupted
+    assert len(calls) == 4
+
+    with pytest.raises(ValueError):
+        eventFarm.scanEfficiencyPurity(volume, wirePitches, angles, 3, alphas, 6, workers=1, chunkSize=2, seed=8, warmStart=False, solver="cd", checkpoint=checkpoint)
+
+def test_recordedScan():
+    volume = DetectorVolume(1000.0, 1000.0)
+    wirePitches = [5.0, 5.0, 5.0]
+    angles = driver.generateAngles(len(wirePitches))
+    alphas = [0.01, 0.1]
+
+    recorders = [instrumentation.Recorder(), instrumentation.Recorder()]
+    for workers, recorder in zip((1, 3), recorders):
+        eventFarm.scanEfficiencyPurity(volume, wirePitches, angles, 3, alphas, 6, workers=workers, chunkSize=2, seed=7, warmStart=False, solver="cd", recorder=recorder)
+
+    #records come back in chunk order whatever the number of workers
+    for recorder in recorders:
+        assert [(event["alphaNo"], event["eventNo"]) for event in recorder.events] == [(alphaNo, eventNo) for alphaNo in range(2) for eventNo in range(6)]
+        assert all(event["solve.solves"] == 1 for event in recorder.events)
+    assert [event["reconstruct.cells"] for event in recorders[0].events] == [event["reconstruct.cells"] for event in recorders[1].events]
+
+def test_stoppedMapChunks():
+    #40 chunks of 0.5 s on 2 workers take 10 s to finish, stopping must not wait for them
+    start = time.monotonic()
+    with pytest.raises(RuntimeError):
+        for result in eventFarm.mapChunks(slowChunk, [0.5] * 40, 2):
+            raise RuntimeError("consumer failed")
+
+    assert time.monotonic() - start < 5.0
+
+    start = time.monotonic()
+    results = eventFarm.mapChunks(slowChunk, [0.5] * 40, 2)
+    next(results)
+    results.close()
+
+    assert time.monotonic() - start < 5.0
+    assert list(eventFarm.mapChunks(slowChunk, [0.0] * 4, 2)) == [0.0] * 4
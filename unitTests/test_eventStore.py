@@ -0,0 +1,77 @@
+#add parent directory to import path
+import os.path, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+#External Dependencies
+import numpy as np
+import pytest
+
+#Internal Dependencies
+import eventStore
+import pipeline
+import driver
+from dataTypes import *
+
+
+def test_eventStore(tmp_path):
+    volume = DetectorVolume(1000.0, 1000.0)
+    wirePitches = [5.0, 5.0, 5.0]
+    angles = driver.generateAngles(len(wirePitches))
+
+    def events():
+        events = pipeline.generateEvents(volume, wirePitches, angles, 4, range(3, 7), 5)
+        return list(pipeline.buildMatrices(pipeline.reconstructEvents(pipeline.mergeEvents(events))))
+
+    written = events()
+    assert eventStore.writeEvents(str(tmp_path / "store"), written, volume, wirePitches, angles) == 4
+    #flushed to disk every three events, so across a partial chunk
+    assert eventStore.writeEvents(str(tmp_path / "flushed"), written, volume, wirePitches, angles, flushEvery=3) == 4
+
+    store = eventStore.EventStore(str(tmp_path / "store"))
+    flushed = eventStore.EventStore(str(tmp_path / "flushed"))
+    assert len(store) == len(flushed) == 4
+    assert isinstance(store.columns["cellVertices"], np.memmap)
+    for column in eventStore.columns:
+        assert (store.columns[column] == flushed.columns[column]).all()
+    assert not any(name.endswith(".part") for name in os.listdir(str(tmp_path / "flushed")))
+
+    for event, stored in zip(written, store):
+        assert stored["eventNo"] == event["eventNo"]
+        assert stored["blobs"] == event["blobs"]
+        assert stored["event"] == event["event"]
+        assert stored["cells"] == event["cells"]
+        assert stored["channelList"] == event["channelList"]
+        assert (stored["geometryMatrix"] != event["geometryMatrix"]).nnz == 0
+        assert (stored["recoWireMatrix"] == event["recoWireMatrix"]).all()
+        assert (stored["trueCellMatrix"] == event["trueCellMatrix"]).all()
+
+    assert store[-1]["eventNo"] == 6
+    with pytest.raises(IndexError):
+        store[4]
+
+def test_emptyEventStore(tmp_path):
+    volume = DetectorVolume(1000.0, 1000.0)
+
+    eventStore.writeEvents(str(tmp_path / "store"), [], volume, [5.0, 5.0], driver.generateAngles(2))
+    store = eventStore.EventStore(str(tmp_path / "store"))
+
+    assert len(store) == 0
+    assert list(store) == []
+
+def test_interruptedEventStore(tmp_path):
+    volume = DetectorVolume(1000.0, 1000.0)
+    wirePitches = [5.0, 5.0]
+    angles = driver.generateAngles(len(wirePitches))
+    events = list(pipeline.buildMatrices(pipeline.reconstructEvents(pipeline.mergeEvents(
+        pipeline.generateEvents(volume, wirePitches, angles, 3, range(3), 5)))))
+
+    #events appended before an exception are kept
+    with pytest.raises(KeyError):
+        with eventStore.EventWriter(str(tmp_path / "store"), volume, wirePitches, angles, flushEvery=2) as writer:
+            for event in events:
+                writer.append(event)
+            writer.append({"eventNo": 3, "event": [[], []]})
+
+    store = eventStore.EventStore(str(tmp_path / "store"))
+    assert [event["eventNo"] for event in store] == [0, 1, 2]
+    assert store[2]["cells"] == events[2]["cells"]
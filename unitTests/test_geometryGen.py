@@ -4,6 +4,8 @@ sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.par
 
 #Internal Dependencies
 import geometryGen
+import utilities
+import driver
 from dataTypes import *
 
 
@@ -39,3 +41,43 @@ def test_generateEvent():
     ans = [{131, 132, 133, 134, 135, 136, 137, 138, 76, 77, 78, 79, 17, 18, 19, 20, 21, 22, 153, 154, 155, 156, 157, 158, 159, 108, 109, 110, 111, 112, 113, 114, 116, 117, 118}, {160, 161, 162, 105, 173, 110, 111, 174, 175, 61, 54, 55, 56, 90, 91, 92, 93, 62}, {128, 129, 130, 71, 72, 73, 74, 75, 82, 83, 84, 85, 33, 34, 35, 36, 37, 161, 162, 163, 164, 165, 183, 184, 185, 186, 187, 188, 125, 126, 127}]
 
     assert geometryGen.generateEvent(planes,blobs) == ans
+
+def test_generateBlobsRng():
+    volume = DetectorVolume(1000.0, 1000.0)
+    planes = utilities.generatePlaneInfo([5.0, 5.0, 5.0], volume, driver.generateAngles(3))
+
+    blobs = geometryGen.generateBlobs(planes, volume, 4, driver.eventRng(3, 12))
+
+    assert geometryGen.generateBlobs(planes, volume, 4, driver.eventRng(3, 12)) == blobs
+    assert geometryGen.generateBlobs(planes, volume, 4, driver.eventRng(3, 13)) != blobs
+
+def test_generateBlobTable():
+    volume = DetectorVolume(1000.0, 1000.0)
+    planes = utilities.generatePlaneInfo([5.0, 5.0, 5.0], volume, driver.generateAngles(3))
+
+    table = geometryGen.generateBlobTable(planes, volume, 4, 5, numberOfEvents=3)
+
+    assert len(table) == 12
+    assert table.noOfEvents == 3
+    assert (table.points >= 0).all() and (table.points[:, :, 0] <= volume.width).all() and (table.points[:, :, 1] <= volume.height).all()
+
+    for blob in table.event(1):
+        assert blob.wires == sum(geometryGen.mergeEvent(utilities.fireWires(planes, blob.points)), [])
+
+    blobs = table.event(2).toBlobs()
+    assert BlobTable.fromBlobs(blobs).toBlobs() == blobs
+
+def test_mergeIntervals():
+    intervals = [(10, 12), (1, 3), (4, 4), (11, 20), (22, 25), (13, 14)]
+
+    ans = [(1, 4), (10, 20), (22, 25)]
+
+    assert geometryGen.mergeIntervals(intervals).tolist() == [list(wire) for wire in ans]
+    assert geometryGen.mergeIntervals([]).shape == (0, 2)
+
+def test_mergeIntervalEvent():
+    volume = DetectorVolume(1000.0, 1000.0)
+    planes = utilities.generatePlaneInfo([5.0, 5.0, 5.0], volume, driver.generateAngles(3))
+    blobs = geometryGen.generateBlobs(planes, volume, 15, 2)
+
+    assert geometryGen.mergeIntervalEvent(geometryGen.generateIntervalEvent(planes, blobs)) == geometryGen.mergeEvent(geometryGen.generateEvent(planes, blobs))
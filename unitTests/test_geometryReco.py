@@ -2,10 +2,19 @@
 import os.path, sys
 sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
 
+#External Dependencies
+import pytest
+
 #Internal Dependencies
 import geometryReco
 from dataTypes import *
 
+def assertCellsApprox(cells, ans):
+    """Cells have the same wires and, to rounding, the same points"""
+    assert [cell.wires for cell in cells] == [cell.wires for cell in ans]
+    for cell, ansCell in zip(cells, ans):
+        assert len(cell.points) == len(ansCell.points)
+        assert sum(map(list, cell.points), []) == pytest.approx(sum(map(list, ansCell.points), []), rel=1e-12, abs=1e-9)
 
 def test_makeLines():
     plane = PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')
@@ -32,7 +41,7 @@ def test_wireIntersection():
 
     ans = [Point(x=500.0, y=288.6751345948028), Point(x=500.0, y=311.7691453623879), Point(x=445.0, y=320.4293994002336), Point(x=445.0, y=343.5234101678187)]
 
-    assert geometryReco.wireIntersection(plane0, wire0, plane1, wire1) == ans
+    assert sum(map(list, geometryReco.wireIntersection(plane0, wire0, plane1, wire1)), []) == pytest.approx(sum(map(list, ans), []), rel=1e-12)
 
 def test_sortPoints():
     points = [Point(x=261.7850716101253, y=245.02750845872833), Point(x=214.89166987825493, y=113.03402239905014), Point(x=0.2455514618699972, y=410.9473923892855), Point(x=581.1125709476491, y=493.9800164009199), Point(x=538.7063614584209, y=205.49539960120322)]
@@ -41,21 +50,64 @@ def test_sortPoints():
 
     assert geometryReco.sortPoints(points) == ans
 
+def test_wirePolygon():
+    planes = PlaneSet([PlaneInfo(angle=1.0471975511965976, pitch=5.0, noOfWires=273, originTranslation=0, sin=0.8660254037844386, cos=0.5000000000000001, gradient=-0.5773502691896263), PlaneInfo(angle=2.0943951023931953, pitch=5.0, noOfWires=273, originTranslation=1000.0, sin=0.8660254037844387, cos=-0.4999999999999998, gradient=0.5773502691896255), PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')])
+
+    wire0 = (100,103)
+    wire1 = (100,110)
+
+    ans = [[500.0, 288.6751345948128], [500.0, 311.7691453623978], [445.0, 343.52341016782725], [445.0, 320.42939940024223]]
+
+    assert geometryReco.wirePolygon(planes, 0, wire0, 2, wire1).ravel().tolist() == pytest.approx(sum(ans, []), rel=1e-12)
+
+def test_clipPolygon():
+    planes = PlaneSet([PlaneInfo(angle=1.0471975511965976, pitch=5.0, noOfWires=273, originTranslation=0, sin=0.8660254037844386, cos=0.5000000000000001, gradient=-0.5773502691896263), PlaneInfo(angle=2.0943951023931953, pitch=5.0, noOfWires=273, originTranslation=1000.0, sin=0.8660254037844387, cos=-0.4999999999999998, gradient=0.5773502691896255), PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')])
+    polygon = geometryReco.wirePolygon(planes, 0, (100,103), 2, (100,110))
+
+    ans0 = [[500.0, 288.6751345948128], [500.0, 294.44863728670924], [494.99999999999983, 291.561885940761]]
+
+    assert geometryReco.clipPolygon(planes, polygon, 1, (100,100)).ravel().tolist() == pytest.approx(sum(ans0, []), rel=1e-12)
+    assert len(geometryReco.clipPolygon(planes, polygon, 1, (0,10))) == 0
+
 def test_checkCell():
     planes = [PlaneInfo(angle=1.0471975511965976, pitch=5.0, noOfWires=273, originTranslation=0, sin=0.8660254037844386, cos=0.5000000000000001, gradient=-0.5773502691896263), PlaneInfo(angle=2.0943951023931953, pitch=5.0, noOfWires=273, originTranslation=1000.0, sin=0.8660254037844387, cos=-0.4999999999999998, gradient=0.5773502691896255), PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')]
     wires0 = [(41, 143), (81, 171), (83, 199)]
     wires1 = [(0, 0), (100, 100), (100, 100)]
 
-    ans0 = Cell(wires=[(41, 143), (81, 171), (83, 199)], points=[Point(x=0.0, y=236.71361036774397), Point(x=300.000000000005, y=63.508529610854275), Point(x=585.0, y=228.05335632990193), Point(x=585.0, y=493.6344801571189), Point(x=360.0000000000362, y=623.5382907247695), Point(x=0.0, y=415.6921938164742)])
+    ans0 = Cell(wires=[(41, 143), (81, 171), (83, 199)], points=[Point(x=299.9999999999998, y=63.508529610858915), Point(x=585.0, y=228.0533563299023), Point(x=585.0, y=493.6344801571298), Point(x=359.99999999999983, y=623.5382907247958), Point(x=1.1368683772161603e-13, y=415.6921938165308), Point(x=8.526512829121202e-14, y=236.71361036774653)])
     ans1 = Cell(False,False)
 
-    assert geometryReco.checkCell(planes, wires0) == ans0
+    assertCellsApprox([geometryReco.checkCell(planes, wires0)], [ans0])
     assert geometryReco.checkCell(planes, wires1) == ans1
 
 def test_reconstructCells():
     planes = [PlaneInfo(angle=1.0471975511965976, pitch=5.0, noOfWires=273, originTranslation=0, sin=0.8660254037844386, cos=0.5000000000000001, gradient=-0.5773502691896263), PlaneInfo(angle=2.0943951023931953, pitch=5.0, noOfWires=273, originTranslation=1000.0, sin=0.8660254037844387, cos=-0.4999999999999998, gradient=0.5773502691896255), PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')]
     event = [[(41, 143),(100, 100)],[(81, 171),(100, 100)],[(83, 199), (100, 100)]]
 
-    ans = [Cell(wires=[(41, 143), (81, 171), (83, 199)], points=[Point(x=0.0, y=236.71361036774397), Point(x=300.000000000005, y=63.508529610854275), Point(x=585.0, y=228.05335632990193), Point(x=585.0, y=493.6344801571189), Point(x=360.0000000000362, y=623.5382907247695), Point(x=0.0, y=415.6921938164742)]), Cell(wires=[(79, 143), (81, 144), (100, 100)], points=[Point(x=500.0, y=542.7092530382392), Point(x=495.0, y=545.5960043841875), Point(x=495.0, y=176.09183210283334), Point(x=500.0, y=178.9785834487816)]), Cell(wires=[(41, 118), (100, 100), (83, 159)], points=[Point(x=585.0, y=343.5234101678276), Point(x=200.0000000000065, y=121.24355652981569), Point(x=204.99999999999383, y=118.3568051838749), Point(x=585.0, y=337.74990747594586)]), Cell(wires=[(99, 100), (100, 100), (100, 100)], points=[Point(x=495.0, y=285.78838324887727), Point(x=500.0, y=288.6751345948255), Point(x=500.0, y=294.44863728670725), Point(x=495.0, y=291.561885940759)]), Cell(wires=[(100, 100), (82, 171), (83, 171)], points=[Point(x=140.0000000000449, y=496.52123150305124), Point(x=585.0, y=239.60036171368245), Point(x=585.0, y=245.37386440559328), Point(x=145.0000000000573, y=499.40798284900666)]), Cell(wires=[(100, 100), (99, 102), (100, 100)], points=[Point(x=495.0, y=291.56188594075104), Point(x=500.0, y=288.6751345948028), Point(x=500.0, y=294.4486372867136), Point(x=495.0, y=297.3353886326619)]), Cell(wires=[(100, 100), (100, 100), (99, 101)], points=[Point(x=500.0000000000055, y=294.44863728671044), Point(x=494.9999999999931, y=291.561885940755), Point(x=499.99999999998033, y=288.67513459481415), Point(x=504.9999999999927, y=291.56188594076957)]), Cell(wires=[(100, 100), (100, 100), (100, 100)], points=[Point(x=494.9999999999931, y=291.561885940755), Point(x=500.0, y=288.6751345948028), Point(x=500.0000000000055, y=294.44863728671044), Point(x=500.0, y=294.4486372867136)])]
+    ans = [Cell(wires=[(41, 143), (81, 171), (83, 199)], points=[Point(x=299.9999999999998, y=63.508529610858915), Point(x=585.0, y=228.0533563299023), Point(x=585.0, y=493.6344801571298), Point(x=359.99999999999983, y=623.5382907247958), Point(x=1.1368683772161603e-13, y=415.6921938165308), Point(x=8.526512829121202e-14, y=236.71361036774653)]), Cell(wires=[(80, 143), (81, 144), (100, 100)], points=[Point(x=495.0, y=176.091832102836), Point(x=500.0, y=178.97858344878415), Point(x=500.00000000000006, y=542.7092530382481), Point(x=495.00000000000006, y=545.5960043841962)]), Cell(wires=[(41, 117), (100, 100), (83, 159)], points=[Point(x=204.9999999999998, y=118.35680518387338), Point(x=585.0, y=337.7499074759312), Point(x=585.0, y=343.5234101678275), Point(x=199.9999999999998, y=121.2435565298215)]), Cell(wires=[(99, 100), (100, 100), (100, 100)], points=[Point(x=495.0000000000001, y=285.7883832488649), Point(x=500.0000000000001, y=288.675134594813), Point(x=500.0, y=294.4486372867093), Point(x=495.0, y=291.56188594076116)]), Cell(wires=[(100, 100), (83, 171), (83, 171)], points=[Point(x=585.0, y=245.37386440559084), Point(x=144.99999999999986, y=499.4079828490263), Point(x=139.99999999999983, y=496.5212315030782), Point(x=585.0, y=239.60036171369455)]), Cell(wires=[(100, 100), (100, 101), (100, 100)], points=[Point(x=500.0, y=294.448637286709), Point(x=495.0, y=297.33538863265716), Point(x=495.0, y=291.56188594076093), Point(x=500.0, y=288.6751345948128)]), Cell(wires=[(100, 100), (100, 100), (99, 100)], points=[Point(x=499.9999999999999, y=288.6751345948129), Point(x=504.9999999999999, y=291.56188594076104), Point(x=499.9999999999999, y=294.44863728670913), Point(x=494.99999999999983, y=291.56188594076104)]), Cell(wires=[(100, 100), (100, 100), (100, 100)], points=[Point(x=499.9999999999999, y=288.6751345948129), Point(x=499.9999999999999, y=294.44863728670913), Point(x=494.99999999999983, y=291.56188594076104)])]
+
+    assertCellsApprox(geometryReco.reconstructCells(planes,event), ans)
+
+def test_wireCrossings():
+    planes = [PlaneInfo(angle=1.0471975511965976, pitch=5.0, noOfWires=273, originTranslation=0, sin=0.8660254037844386, cos=0.5000000000000001, gradient=-0.5773502691896263), PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')]
+
+    crossings = geometryReco.wireCrossings(planes, 0, [[100], [104]], 1, [100, 111])
+
+    assert crossings.shape == (2, 2, 2)
+    assert crossings.ravel().tolist() == pytest.approx([500.0, 288.6751345948028, 445.0, 320.4293994002336, 500.0, 311.7691453623879, 445.0, 343.5234101678187], rel=1e-12)
+
+def test_cellTable():
+    cells = [Cell(wires=[(41, 143), (81, 171), (83, 199)], points=[Point(x=300.0, y=63.5), Point(x=585.0, y=228.0), Point(x=585.0, y=493.5)]), Cell(wires=[(80, 143), (81, 144), (100, 100)], points=[Point(x=500.0, y=288.5), Point(x=500.0, y=294.25), Point(x=495.0, y=291.5), Point(x=490.0, y=290.0)])]
+
+    table = CellTable.fromCells(cells)
+
+    assert len(table) == 2
+    assert table.offsets.tolist() == [0, 3, 7]
+    assert table == cells
+    assert table[1].points[2] == Point(x=495.0, y=291.5)
+    assert table[1].points.x.tolist() == [500.0, 500.0, 495.0, 490.0]
+    assert table.toCells() == cells
 
-    assert geometryReco.reconstructCells(planes,event) == ans
+    #cells share the vertices of the table
+    table[0].points.coordinates[0, 0] = 301.0
+    assert table.vertices[0, 0] == 301.0
@@ -0,0 +1,77 @@
+#add parent directory to import path
+import os.path, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+#External Dependencies
+import csv
+import json
+
+#Internal Dependencies
+import instrumentation
+import driver
+import pipeline
+from dataTypes import *
+
+
+def test_recorder(tmp_path):
+    recorder = instrumentation.Recorder()
+
+    for eventNo in range(3):
+        recorder.startEvent(eventNo=eventNo)
+        with recorder.stage("reconstruct"):
+            recorder.count("reconstruct.cells", eventNo)
+            recorder.count("reconstruct.cells", 1)
+        recorder.endEvent()
+
+    assert [event["reconstruct.cells"] for event in recorder.events] == [1, 2, 3]
+    assert recorder.fields() == ["eventNo", "reconstruct.cells", "reconstruct.time"]
+
+    summary = recorder.summary()
+    assert summary["reconstruct.cells"] == {"events": 3, "total": 6.0, "mean": 2.0, "min": 1.0, "max": 3.0}
+    assert summary["reconstruct.time"]["events"] == 3
+
+    recorder.toJSON(tmp_path / "run.json")
+    with open(tmp_path / "run.json") as inputFile:
+        assert json.load(inputFile)["summary"] == summary
+
+    recorder.toCSV(tmp_path / "run.csv")
+    with open(tmp_path / "run.csv") as inputFile:
+        rows = list(csv.DictReader(inputFile))
+    assert [int(row["reconstruct.cells"]) for row in rows] == [1, 2, 3]
+
+def test_instrumentedDrive():
+    volume = DetectorVolume(1000.0, 1000.0)
+    wirePitches = [5.0, 5.0, 5.0]
+    angles = driver.generateAngles(len(wirePitches))
+    recorder = instrumentation.Recorder()
+
+    instrumented = driver.drive(volume, wirePitches, angles, 4, 0.1, "cd", driver.eventRng(3, 0), recorder)
+    plain = driver.drive(volume, wirePitches, angles, 4, 0.1, "cd", driver.eventRng(3, 0))
+
+    #recording doesn't change the results and the null recorder records nothing
+    assert instrumented[1] == plain[1]
+    assert (instrumented[5] == plain[5]).all()
+    assert len(recorder.events) == 1
+
+    event = recorder.events[0]
+    cells, geometryMatrix = instrumented[1], instrumented[3]
+    assert event["reconstruct.cells"] == len(cells)
+    assert event["reconstruct.candidates"] >= len(cells)
+    assert (event["geometryMatrix.rows"], event["geometryMatrix.columns"]) == geometryMatrix.shape
+    assert event["geometryMatrix.nnz"] == geometryMatrix.nnz
+    assert event["solve.solves"] == 1 and event["solve.iterations"] > 0
+    assert all(stage + ".time" in event for stage in ("generate", "merge", "reconstruct", "geometryMatrix", "measure", "whiten", "truth", "solve"))
+
+def test_instrumentedPipeline():
+    volume = DetectorVolume(1000.0, 1000.0)
+    wirePitches = [5.0, 5.0, 5.0]
+    angles = driver.generateAngles(len(wirePitches))
+    recorder = instrumentation.Recorder()
+
+    events = list(pipeline.run(volume, wirePitches, angles, 4, [0.1, 0.01], range(2, 5), 11, "cd", recorder=recorder))
+
+    assert [event["eventNo"] for event in recorder.events] == [2, 3, 4]
+    for event, record in zip(events, recorder.events):
+        assert record["reconstruct.cells"] == event["noOfCells"]
+        assert record["solve.solves"] == 2
+        assert "score.time" in record
@@ -0,0 +1,45 @@
+#add parent directory to import path
+import os.path, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+#External Dependencies
+import pytest
+from scipy import sparse
+
+#Internal Dependencies
+import matrixGeneration
+from dataTypes import *
+
+
+def test_constructGeometryMatrix():
+    planes = [PlaneInfo(angle=1.0471975511965976, pitch=5.0, noOfWires=273, originTranslation=0, sin=0.8660254037844386, cos=0.5000000000000001, gradient=-0.5773502691896263), PlaneInfo(angle=2.0943951023931953, pitch=5.0, noOfWires=273, originTranslation=1000.0, sin=0.8660254037844387, cos=-0.4999999999999998, gradient=0.5773502691896255), PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')]
+    cells = [Cell(wires=[(41, 43), (81, 84), (83, 83)], points=[]), Cell(wires=[(42, 43), (81, 81), (84, 85)], points=[])]
+
+    ansChannels = [(41, 41), (42, 43), (354, 354), (355, 357), (629, 629), (630, 631)]
+    ansMatrix = [[0.3333333333333333, 0.0], [0.6666666666666666, 1.0], [0.25, 1.0], [0.75, 0.0], [1.0, 0.0], [0.0, 1.0]]
+
+    channelList, geometryMatrix = matrixGeneration.constructGeometryMatrix(planes, cells)
+
+    assert channelList == ansChannels
+    assert sparse.issparse(geometryMatrix)
+    assert geometryMatrix.toarray().tolist() == ansMatrix
+
+def test_measureCharge():
+    planes = [PlaneInfo(angle=1.0471975511965976, pitch=5.0, noOfWires=273, originTranslation=0, sin=0.8660254037844386, cos=0.5000000000000001, gradient=-0.5773502691896263), PlaneInfo(angle=2.0943951023931953, pitch=5.0, noOfWires=273, originTranslation=1000.0, sin=0.8660254037844387, cos=-0.4999999999999998, gradient=0.5773502691896255), PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')]
+    blobs = [Blob(charge=6.0, wires=[(41, 43), (81, 82), (83, 83)], points=[Point(0, 0), Point(0, 0)]), Blob(charge=2.0, wires=[(43, 44), (82, 82), (0, 1)], points=[Point(0, 0), Point(0, 0)])]
+
+    chargeList = matrixGeneration.constructChargeList(planes, blobs)
+
+    assert matrixGeneration.measureCharge([(41, 42), (43, 43), (354, 355), (546, 546), (629, 629)], chargeList).A1.tolist() == pytest.approx([4.0, 3.0, 8.0, 1.0, 6.0])
+
+    with pytest.raises(matrixGeneration.ChannelRangeError):
+        matrixGeneration.measureCharge([(740, 760)], chargeList)
+
+def test_generateTrueCellMatrix():
+    cells = [Cell(wires=[(41, 43), (81, 84), (83, 83)], points=[]), Cell(wires=[(42, 43), (81, 81), (84, 85)], points=[]), Cell(wires=[(41, 43), (80, 84), (83, 84)], points=[]), Cell(wires=[(60, 62), (81, 84), (83, 83)], points=[])]
+    blobs = [Blob(charge=2.0, wires=[(42, 43), (82, 83), (83, 83)], points=[]), Blob(charge=3.0, wires=[(41, 41), (80, 81), (84, 84)], points=[]), Blob(charge=4.0, wires=[(61, 61), (81, 81), (83, 83)], points=[]), Blob(charge=5.0, wires=[(43, 60), (81, 81), (83, 83)], points=[]), Blob(charge=1.0, wires=[(43, 43), (84, 84), (83, 83)], points=[])]
+
+    ans = [[3.0], [0.0], [3.0], [4.0]]
+
+    assert matrixGeneration.CellIndex(cells).find([blob.wires for blob in blobs]).tolist() == [0, 2, 3, -1, 0]
+    assert matrixGeneration.generateTrueCellMatrix(blobs, cells).tolist() == ans
@@ -0,0 +1,33 @@
+#add parent directory to import path
+import os.path, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+#Internal Dependencies
+import pipeline
+import driver
+import scoring
+from dataTypes import *
+
+
+def test_run():
+    volume = DetectorVolume(1000.0, 1000.0)
+    wirePitches = [5.0, 5.0, 5.0]
+    angles = driver.generateAngles(len(wirePitches))
+    alphas = [0.1, 0.01]
+
+    events = list(pipeline.run(volume, wirePitches, angles, 4, alphas, range(2, 5), 11, "cd", keep=("cells",)))
+
+    assert [event["eventNo"] for event in events] == [2, 3, 4]
+    assert set(events[0]) == set(pipeline.metricFields) | {"cells"}
+
+    #every event matches driving it on its own
+    for event in events:
+        blobs, cells, channelList, geometryMatrix, recoWireMatrix, recoCellMatrices, trueCellMatrix = driver.drivePath(
+            volume, wirePitches, angles, 4, alphas, "cd", driver.eventRng(11, event["eventNo"]))
+
+        assert event["cells"] == cells
+        assert event["noOfBlobs"] == len(blobs)
+        for alphaNo, recoCellMatrix in enumerate(recoCellMatrices):
+            score = scoring.scoreEvent(recoCellMatrix, trueCellMatrix, len(blobs))
+            assert (event["correctIDs"][alphaNo], event["fakeIDs"][alphaNo], event["missedIDs"][alphaNo]) == score[:3]
+            assert event["correctFractions"][alphaNo] == score.correctFraction
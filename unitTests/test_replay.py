@@ -0,0 +1,64 @@
+#add parent directory to import path
+import os.path, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+#External Dependencies
+import numpy as np
+
+#Internal Dependencies
+import replay
+import eventFarm
+import covariance
+import eventStore
+import pipeline
+import driver
+import utilities
+from dataTypes import *
+
+
+def test_replay(tmp_path):
+    volume = DetectorVolume(1000.0, 1000.0)
+    wirePitches = [5.0, 5.0, 5.0]
+    angles = driver.generateAngles(len(wirePitches))
+    alphas = [0.1, 0.01]
+    path = str(tmp_path / "store")
+
+    events = pipeline.generateEvents(volume, wirePitches, angles, 4, range(3, 7), 5)
+    eventStore.writeEvents(path, pipeline.buildMatrices(pipeline.reconstructEvents(pipeline.mergeEvents(events))), volume, wirePitches, angles)
+
+    #replaying stored events scores them as running them from scratch
+    expected = list(pipeline.run(volume, wirePitches, angles, 4, alphas, range(3, 7), 5, "cd"))
+    replayed = list(replay.run(path, alphas, "cd"))
+
+    assert replayed == expected
+
+    serial = replay.scanEfficiencyPurity(path, alphas, "cd", workers=1, chunkSize=1)
+    parallel = replay.scanEfficiencyPurity(path, alphas, "cd", workers=2, chunkSize=1)
+
+    assert serial == parallel
+    assert serial[2] == 4
+    assert serial[0] == [sum(event["correctFractions"][alphaNo] for event in expected) for alphaNo in range(len(alphas))]
+
+def test_replayNoise(tmp_path):
+    volume = DetectorVolume(1000.0, 1000.0)
+    wirePitches = [5.0, 5.0, 5.0]
+    angles = driver.generateAngles(len(wirePitches))
+    alphas = [0.1, 0.01]
+    path = str(tmp_path / "store")
+
+    events = list(pipeline.buildMatrices(pipeline.reconstructEvents(pipeline.mergeEvents(pipeline.generateEvents(volume, wirePitches, angles, 4, range(3), 5)))))
+    eventStore.writeEvents(path, events, volume, wirePitches, angles)
+    assert len(set(len(event["channelList"]) for event in events)) > 1
+
+    #the noise of every event is built from its own merged channels
+    noOfChannels = sum(plane.noOfWires for plane in utilities.getPlaneSet(wirePitches, volume, angles))
+    noise = covariance.ChannelNoise(np.linspace(0.5, 4.0, noOfChannels))
+    expected = list(pipeline.run(volume, wirePitches, angles, 4, alphas, range(3), 5, "cd", noise=noise))
+    replayed = list(replay.run(path, alphas, "cd", noise=noise))
+
+    assert replayed == expected
+    assert replayed != list(replay.run(path, alphas, "cd"))
+
+    correctSums, fakeSums = eventFarm.sumFractions(replayed, len(alphas))
+
+    assert replay.scanEfficiencyPurity(path, alphas, "cd", workers=2, chunkSize=1, noise=noise) == (correctSums.tolist(), fakeSums.tolist(), 3)
@@ -0,0 +1,31 @@
+#add parent directory to import path
+import os.path, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+#External Dependencies
+import numpy as np
+import pytest
+
+#Internal Dependencies
+import scoring
+from dataTypes import *
+
+
+def test_scoreEvent():
+    recoCellMatrix = np.matrix([[4.5], [0.0], [0.2], [0.0], [1e-9]])
+    trueCellMatrix = np.matrix([[5.0], [3.0], [0.0], [0.0], [0.0]])
+
+    score = scoring.scoreEvent(recoCellMatrix, trueCellMatrix, 2)
+
+    assert score[:3] == (1, 2, 1)
+    assert score.chargeResidual == pytest.approx(0.5 + 3.0 + 0.2 + 1e-9)
+    assert (score.correctFraction, score.fakeFraction) == (0.5, 1.0)
+
+def test_scoreEvents():
+    recoCellMatrices = [np.matrix([[4.5], [0.0], [0.2]]), np.zeros(0), np.array([1.0, 2.0])]
+    trueCellMatrices = [np.matrix([[5.0], [3.0], [0.0]]), np.zeros(0), np.array([1.0, 0.0])]
+
+    score = scoring.scoreEvents(recoCellMatrices, trueCellMatrices, [2, 1, 4])
+
+    for eventNo in range(3):
+        assert tuple(field[eventNo] for field in score) == pytest.approx(tuple(scoring.scoreEvent(recoCellMatrices[eventNo], trueCellMatrices[eventNo], [2, 1, 4][eventNo])))
@@ -2,6 +2,9 @@
 import os.path, sys
 sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
 
+#External Dependencies
+import pytest
+
 #Internal Dependencies
 import utilities
 from dataTypes import *
@@ -24,6 +27,31 @@ def test_generatePlaneInfo():
 
    assert utilities.generatePlaneInfo(wirePitches, volume, angles) == ans
 
+def test_planeSet():
+    planes = PlaneSet([PlaneInfo(angle=1.0471975511965976, pitch=5.0, noOfWires=273, originTranslation=0, sin=0.8660254037844386, cos=0.5000000000000001, gradient=-0.5773502691896263), PlaneInfo(angle=2.0943951023931953, pitch=5.0, noOfWires=273, originTranslation=1000.0, sin=0.8660254037844387, cos=-0.4999999999999998, gradient=0.5773502691896255), PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')])
+
+    assert planes.noOfWires.tolist() == [273, 273, 200]
+    assert planes.channelOffsets.tolist() == [0, 273, 546]
+    assert planes.offsets.tolist() == [0.0, -499.9999999999998, -1000.0]
+    assert planes[1].pitch == planes.pitch[1]
+    assert utilities.asPlaneSet(planes) is planes
+
+    transform = planes.crossingTransform(0, 1)
+    assert transform.shape == (2, 3)
+    assert planes.crossingTransform(0, 1) is transform
+    assert (transform @ [0, 200, 1]).tolist() == pytest.approx([-500.0, 288.6751345948131])
+    assert utilities.wireCoordinatesFromPoints(planes, [transform @ [10, 20, 1], transform @ [40, 7, 1]])[:, :2].ravel().tolist() == pytest.approx([10, 20, 40, 7])
+
+def test_getPlaneSet():
+    volume = DetectorVolume(1000.0, 1000.0)
+    angles = [1.0471975511965976, 2.0943951023931953, 3.141592653589793]
+
+    planes = utilities.getPlaneSet([5.0, 5.0, 5.0], volume, angles)
+
+    assert planes == utilities.generatePlaneInfo([5.0, 5.0, 5.0], volume, angles)
+    assert utilities.getPlaneSet((5, 5, 5), DetectorVolume(1000, 1000), tuple(angles)) is planes
+    assert utilities.getPlaneSet([5.0, 5.0, 4.0], volume, angles) is not planes
+
 def test_wireNumberFromPoint():
     planes = [PlaneInfo(angle=1.0471975511965976, pitch=5.0, noOfWires=273, originTranslation=0, sin=0.8660254037844386, cos=0.5000000000000001, gradient=-0.5773502691896263), PlaneInfo(angle=2.0943951023931953, pitch=5.0, noOfWires=273, originTranslation=1000.0, sin=0.8660254037844387, cos=-0.4999999999999998, gradient=0.5773502691896255), PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')]
 
@@ -35,6 +63,24 @@ def test_wireNumberFromPoint():
         for planeNo, plane in enumerate(planes):
             assert utilities.wireNumberFromPoint(plane, point) == ans[pointNo][planeNo]
 
+def test_wireNumbersFromPoints():
+    planes = [PlaneInfo(angle=1.0471975511965976, pitch=5.0, noOfWires=273, originTranslation=0, sin=0.8660254037844386, cos=0.5000000000000001, gradient=-0.5773502691896263), PlaneInfo(angle=2.0943951023931953, pitch=5.0, noOfWires=273, originTranslation=1000.0, sin=0.8660254037844387, cos=-0.4999999999999998, gradient=0.5773502691896255), PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')]
+
+    points = [Point(x=261.7850716101253, y=245.02750845872833), Point(x=214.89166987825493, y=113.03402239905014), Point(x=0.2455514618699972, y=410.9473923892855), Point(x=581.1125709476491, y=493.9800164009199), Point(x=538.7063614584209, y=205.49539960120322)]
+
+    ans = [[68, 116, 147], [41, 98, 157], [71, 171, 199], [143, 127, 83], [89, 81, 92]]
+
+    assert utilities.wireNumbersFromPoints(planes, points).tolist() == ans
+
+def test_pointsInWires():
+    planes = [PlaneInfo(angle=1.0471975511965976, pitch=5.0, noOfWires=273, originTranslation=0, sin=0.8660254037844386, cos=0.5000000000000001, gradient=-0.5773502691896263), PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')]
+    points = [Point(995,500),Point(990,500),Point(500,500)]
+    wires = [(186,186),(1,1)]
+
+    ans = [[True, True], [False, True], [False, False]]
+
+    assert utilities.pointsInWires(planes, points, wires).tolist() == ans
+
 def test_pointInWire():
     plane = PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')
     points = [Point(995,500),Point(990,500),Point(985,500),Point(980,500),Point(975,500)]
@@ -59,3 +105,22 @@ def test_getChannelNo():
     ans = 373
 
     assert utilities.getChannelNo(planes, wireNo, planeNo) == ans
+
+def test_getChannelNos():
+    planes = [PlaneInfo(angle=1.0471975511965976, pitch=5.0, noOfWires=273, originTranslation=0, sin=0.8660254037844386, cos=0.5000000000000001, gradient=-0.5773502691896263), PlaneInfo(angle=2.0943951023931953, pitch=5.0, noOfWires=273, originTranslation=1000.0, sin=0.8660254037844387, cos=-0.4999999999999998, gradient=0.5773502691896255), PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')]
+    wireNos = [100, 0, 199, 5]
+    planeNos = [1, 2, 2, 0]
+
+    ans = [373, 546, 745, 5]
+
+    assert utilities.getChannelNos(planes, wireNos, planeNos).tolist() == ans
+
+def test_getWiresFromChannels():
+    planes = [PlaneInfo(angle=1.0471975511965976, pitch=5.0, noOfWires=273, originTranslation=0, sin=0.8660254037844386, cos=0.5000000000000001, gradient=-0.5773502691896263), PlaneInfo(angle=2.0943951023931953, pitch=5.0, noOfWires=273, originTranslation=1000.0, sin=0.8660254037844387, cos=-0.4999999999999998, gradient=0.5773502691896255), PlaneInfo(angle=3.141592653589793, pitch=5.0, noOfWires=200, originTranslation=1000.0, sin=1.2246467991473532e-16, cos=-1.0, gradient='INF')]
+    channelNos = [373, 546, 745, 5]
+
+    planeNos, wireNos = utilities.getWiresFromChannels(planes, channelNos)
+
+    assert planeNos.tolist() == [1, 2, 2, 0]
+    assert wireNos.tolist() == [100, 0, 199, 5]
+    assert utilities.getWireFromChannel(planes, 272) == (0, 272)
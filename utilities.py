@@ -1,5 +1,7 @@
 #External Dependencies
 import math
+import functools
+import numpy as np
 
 #internal Dependencies
 from dataTypes import *
@@ -18,7 +20,7 @@ def generatePlaneInfo(wirePitches, volume, angles):
 
     Returns
     -------
-    list of PlaneInfo
+    PlaneSet
         List of information regarding the planes.
 
     """
@@ -54,7 +56,56 @@ def generatePlaneInfo(wirePitches, volume, angles):
         planes.append(PlaneInfo(angle, pitch, noOfWires,
                                 originTranslation, sin, cos, gradient))
 
-    return planes
+    return PlaneSet(planes)
+
+#number of detector configurations whose geometry is kept by getPlaneSet
+planeSetCacheSize = 16
+
+def getPlaneSet(wirePitches, volume, angles):
+    """Plane information for a detector, shared between every call with the same configuration
+
+    Scans reuse a few detector configurations for many events, so the plane
+    information, and the geometry cached on it, is built once per
+    configuration. The planes returned must not be modified.
+
+    Parameters
+    ----------
+    wirePitches : list or tuple of int or float
+        A list of wire pitches, each number corresponding to the pitch of each plane
+    volume : DetectorVolume
+        The width and height of the detector
+    angles : list or tuple of float
+        List of the angles of the wire plane in radians
+
+    Returns
+    -------
+    PlaneSet
+        List of information regarding the planes.
+
+    """
+    return _cachedPlaneSet(tuple(float(pitch) for pitch in wirePitches), DetectorVolume(float(volume.width), float(volume.height)), tuple(float(angle) for angle in angles))
+
+@functools.lru_cache(maxsize=planeSetCacheSize)
+def _cachedPlaneSet(wirePitches, volume, angles):
+    return generatePlaneInfo(wirePitches, volume, angles)
+
+def asPlaneSet(planes):
+    """Make sure plane information is held in a PlaneSet
+
+    Parameters
+    ----------
+    planes : list of PlaneInfo or PlaneSet
+        A list containing information for all the planes in the detector
+
+    Returns
+    -------
+    PlaneSet
+        The same planes, only copied if they were not already a PlaneSet
+
+    """
+    if isinstance(planes, PlaneSet):
+        return planes
+    return PlaneSet(planes)
 
 def wireNumberFromPoint(plane, point):
     """Generates the wire number for a point given a certain plane
@@ -74,6 +125,76 @@ def wireNumberFromPoint(plane, point):
     """
     return math.floor((plane.cos * point.x + plane.sin * point.y - plane.cos * plane.originTranslation) / plane.pitch)
 
+def wireCoordinatesFromPoints(planes, points):
+    """Generates the continuous wire coordinate of many points in every plane at once
+
+    Parameters
+    ----------
+    planes : list of PlaneInfo or PlaneSet
+        A list containing information for all the planes in the detector
+    points : list of Point or array_like of shape (N, 2)
+        The points being queried
+
+    Returns
+    -------
+    np.ndarray of shape (N, nPlanes) of float
+        Wire coordinate of every point in every plane, the integer part being the primitive wire number
+
+    """
+    planes = asPlaneSet(planes)
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+
+    return (points[:, [0]] * planes.cos + points[:, [1]] * planes.sin - planes.offsets) / planes.pitch
+
+def wireNumbersFromPoints(planes, points):
+    """Generates the wire numbers of many points in every plane at once
+
+    Parameters
+    ----------
+    planes : list of PlaneInfo or PlaneSet
+        A list containing information for all the planes in the detector
+    points : list of Point or array_like of shape (N, 2)
+        The points being queried
+
+    Returns
+    -------
+    np.ndarray of shape (N, nPlanes) of int
+        Primitive wire number of every point in every plane
+
+    """
+    return np.floor(wireCoordinatesFromPoints(planes, points)).astype(int)
+
+def pointsInWires(planes, points, wires):
+    """Check which points are inside the merged wires of every plane
+
+    Parameters
+    ----------
+    planes : list of PlaneInfo or PlaneSet
+        A list containing information for all the planes in the detector
+    points : list of Point or array_like of shape (N, 2)
+        The points being queried
+    wires : list of tuple[2] of int
+        A merged wire for each plane
+
+    Returns
+    -------
+    np.ndarray of shape (N, nPlanes) of bool
+        True where the point is inside (or on the edge of) the merged wire of that plane
+
+    """
+    wireFloat = wireCoordinatesFromPoints(planes, points)
+    wireInt = np.floor(wireFloat)
+    wires = np.asarray(wires).reshape(-1, 2)
+    lower = wires[:, 0]
+    upper = wires[:, 1] + 1
+
+    insideWire = (wireInt >= wires[:, 0]) & (wireInt <= wires[:, 1])
+    #same tolerance as math.isclose(a, b, rel_tol=1e-5)
+    onEdge = (np.abs(wireFloat - lower) <= 1e-5 * np.maximum(np.abs(wireFloat), np.abs(lower))) | \
+             (np.abs(wireFloat - upper) <= 1e-5 * np.maximum(np.abs(wireFloat), np.abs(upper)))
+
+    return insideWire | onEdge
+
 def pointInWire(plane,point,wire):
     """Check if a point is inside a certain merged wire
 
@@ -92,20 +213,14 @@ def pointInWire(plane,point,wire):
         True if point is in wire, False if not
 
     """
-    wireFloat = (plane.cos * point.x + plane.sin * point.y - plane.cos * plane.originTranslation) / plane.pitch
-    wireInt = math.floor(wireFloat)
-
-    insideWire = wireInt>=wire[0] and wireInt<=wire[1]
-    onEdge = math.isclose(wireFloat,(wire[0]),rel_tol=1e-5) or math.isclose(wireFloat,(wire[1]+1),rel_tol=1e-5)
-
-    return insideWire or onEdge
+    return bool(pointsInWires([plane], [point], [wire])[0, 0])
 
 def fireWires(planes, points):
     """Show which wires have been hit for a given blob
 
     Parameters
     ----------
-    planes : list of PlaneInfo
+    planes : list of PlaneInfo or PlaneSet
         A list containing information for all the planes in the detector
     points : list of points
         points defining ConvexHull of blob
@@ -116,29 +231,16 @@ def fireWires(planes, points):
         A list that has lists of merged wire numbers. one list for every plane
 
     """
-    firedWires = []
-    for planeNo, plane in enumerate(planes):
-        for pointNo, point in enumerate(points):
-            wireNo = wireNumberFromPoint(plane, point)
-
-            if pointNo == 0:
-                min = wireNo
-                max = wireNo
-            elif wireNo > max:
-                max = wireNo
-            elif wireNo < min:
-                min = wireNo
+    wireNos = wireNumbersFromPoints(planes, points)
 
-        firedWires.append(list(range(min, max + 1)))
-
-    return firedWires
+    return [list(range(int(min), int(max) + 1)) for min, max in zip(wireNos.min(axis=0), wireNos.max(axis=0))]
 
 def getChannelNo(planes, wireNo, planeNo):
     """Get Channel Number for a primitve wire
 
     Parameters
     ----------
-    planes : list of PlaneInfo
+    planes : list of PlaneInfo or PlaneSet
         A list containing information for all the planes in the detector
     wireNo : int
         Primitive Wire
@@ -151,11 +253,93 @@ def getChannelNo(planes, wireNo, planeNo):
         Channel number for a primitive wire
 
     """
-    trueWireNo = 0
+    return int(asPlaneSet(planes).channelOffsets[planeNo]) + wireNo
+
+
+def getChannelNos(planes, wireNos, planeNos):
+    """Get Channel Numbers for many primitive wires at once
 
-    for plane in range(0,planeNo):
-        trueWireNo += planes[plane].noOfWires
+    Parameters
+    ----------
+    planes : list of PlaneInfo or PlaneSet
+        A list containing information for all the planes in the detector
+    wireNos : array_like of int
+        Primitive Wires
+    planeNos : array_like of int
+        Index of plane each wire is in, broadcast against wireNos
+
+    Returns
+    -------
+    np.ndarray of int
+        Channel number for every primitive wire
+
+    """
+    return asPlaneSet(planes).channelOffsets[np.asarray(planeNos)] + np.asarray(wireNos)
+
+def getWireFromChannel(planes, channelNo):
+    """Get the primitive wire a channel number corresponds to
+
+    Parameters
+    ----------
+    planes : list of PlaneInfo or PlaneSet
+        A list containing information for all the planes in the detector
+    channelNo : int
+        Channel number
 
-    trueWireNo += wireNo
+    Returns
+    -------
+    tuple[2] of int
+        Index of plane the wire is in and primitive wire number
+
+    """
+    planeNos, wireNos = getWiresFromChannels(planes, [channelNo])
+
+    return int(planeNos[0]), int(wireNos[0])
+
+def getWiresFromChannels(planes, channelNos):
+    """Get the primitive wires many channel numbers correspond to
+
+    Parameters
+    ----------
+    planes : list of PlaneInfo or PlaneSet
+        A list containing information for all the planes in the detector
+    channelNos : array_like of int
+        Channel numbers
+
+    Returns
+    -------
+    np.ndarray of int, np.ndarray of int
+        Index of plane each wire is in, primitive wire numbers
+
+    """
+    channelOffsets = asPlaneSet(planes).channelOffsets
+    channelNos = np.asarray(channelNos)
+    planeNos = np.searchsorted(channelOffsets, channelNos, side='right') - 1
+
+    return planeNos, channelNos - channelOffsets[planeNos]
+
+def eventRng(seed, *eventIndex):
+    """Independent random number stream for a single event
+
+    Any event of a seeded run can be replayed on its own, e.g.
+    driver.drive(volume, wirePitches, angles, noOfBlobs, alpha, rng=utilities.eventRng(seed, eventNo))
+
+    Parameters
+    ----------
+    seed : int or np.random.SeedSequence
+        Seed of the whole run
+    eventIndex : int
+        Index of the event in the run, e.g. (alphaNo, eventNo)
+
+    Returns
+    -------
+    np.random.Generator
+        Random number generator for the event
+
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        seedSequence = np.random.SeedSequence(seed.entropy, spawn_key=tuple(seed.spawn_key) + eventIndex)
+    else:
+        seedSequence = np.random.SeedSequence(seed, spawn_key=eventIndex)
 
-    return trueWireNo
+    return np.random.default_rng(seedSequence)